@@ -1,9 +1,29 @@
 from django.contrib import admin
-from .models import PersonalRecord, ProgressSnapshot
+from .models import (
+    PersonalRecord,
+    PersonalRecordHistory,
+    ProgressSnapshot,
+    ExerciseDailySummary,
+    DailyTrainingLoad,
+    UserTrainingSummary,
+    ExerciseFrequency,
+    TrainingStreak,
+    StrengthPercentileIndex,
+)
 
 
 @admin.register(PersonalRecord)
 class PersonalRecordAdmin(admin.ModelAdmin):
+    list_display = ['user', 'exercise', 'record_type', 'value', 'date_achieved', 'is_automatic']
+    list_filter = ['record_type', 'is_automatic', 'date_achieved']
+    search_fields = ['user__username', 'user__email', 'exercise__name']
+    raw_id_fields = ['user', 'exercise', 'workout']
+    date_hierarchy = 'date_achieved'
+    ordering = ['-date_achieved']
+
+
+@admin.register(PersonalRecordHistory)
+class PersonalRecordHistoryAdmin(admin.ModelAdmin):
     list_display = ['user', 'exercise', 'record_type', 'value', 'date_achieved']
     list_filter = ['record_type', 'date_achieved']
     search_fields = ['user__username', 'user__email', 'exercise__name']
@@ -34,3 +54,58 @@ class ProgressSnapshotAdmin(admin.ModelAdmin):
             'fields': ('notes', 'photo')
         }),
     )
+
+
+@admin.register(ExerciseDailySummary)
+class ExerciseDailySummaryAdmin(admin.ModelAdmin):
+    list_display = ['user', 'exercise', 'date', 'set_count', 'max_weight', 'total_volume', 'best_one_rep_max']
+    list_filter = ['date']
+    search_fields = ['user__username', 'user__email', 'exercise__name']
+    raw_id_fields = ['user', 'exercise']
+    date_hierarchy = 'date'
+    ordering = ['-date']
+
+
+@admin.register(DailyTrainingLoad)
+class DailyTrainingLoadAdmin(admin.ModelAdmin):
+    list_display = ['user', 'date', 'set_count', 'total_reps', 'total_volume']
+    list_filter = ['date']
+    search_fields = ['user__username', 'user__email']
+    raw_id_fields = ['user']
+    date_hierarchy = 'date'
+    ordering = ['-date']
+
+
+@admin.register(UserTrainingSummary)
+class UserTrainingSummaryAdmin(admin.ModelAdmin):
+    list_display = [
+        'user', 'total_workouts', 'total_sets', 'total_volume',
+        'current_streak', 'longest_streak', 'last_active_date',
+    ]
+    search_fields = ['user__username', 'user__email']
+    raw_id_fields = ['user']
+
+
+@admin.register(ExerciseFrequency)
+class ExerciseFrequencyAdmin(admin.ModelAdmin):
+    list_display = ['user', 'exercise', 'session_count']
+    search_fields = ['user__username', 'user__email', 'exercise__name']
+    raw_id_fields = ['user', 'exercise']
+    ordering = ['user', '-session_count']
+
+
+@admin.register(TrainingStreak)
+class TrainingStreakAdmin(admin.ModelAdmin):
+    list_display = ['user', 'start_date', 'end_date', 'day_count']
+    search_fields = ['user__username', 'user__email']
+    raw_id_fields = ['user']
+    date_hierarchy = 'end_date'
+
+
+@admin.register(StrengthPercentileIndex)
+class StrengthPercentileIndexAdmin(admin.ModelAdmin):
+    list_display = ['exercise', 'record_type', 'user_count', 'built_at']
+    list_filter = ['record_type']
+    search_fields = ['exercise__name']
+    raw_id_fields = ['exercise']
+    exclude = ['points']
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AnalyticsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'analytics'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from woodshop_api import thumbnails
+        thumbnails.register(self.get_model('ProgressSnapshot'), 'photo', 'photo_thumbnails')
@@ -0,0 +1,107 @@
+"""
+Versioned per-user response cache for AnalyticsViewSet.
+
+Cached payloads are keyed by user, action, normalised query parameters,
+today's date (most actions default to ranges relative to today), the
+exercise catalogue version and the user's data version. Any write that can
+change a user's data bumps their UserDataVersion row after it commits, so
+stale entries are simply never read again and expire on their own. The version lives in the database rather than
+the cache so every process sees the same value.
+
+Only plain get/set/add/incr calls are used so the local-memory and
+file-based backends both work.
+"""
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.response import Response
+
+from .catalog import get_catalog_version
+from .models import UserDataVersion
+
+KEY_PREFIX = 'analytics'
+STATS_KEYS = ('hits', 'misses')
+
+
+def get_data_version(user_id):
+    """Current data version for a user, creating the counter on first use"""
+    version = UserDataVersion.objects.filter(user_id=user_id).values_list(
+        'version', flat=True
+    ).first()
+    if version is None:
+        version = UserDataVersion.objects.get_or_create(user_id=user_id)[0].version
+    return version
+
+
+def bump_data_version(user_ids):
+    """
+    Increment the data version of the given users. Users without a counter
+    have nothing cached yet and are left alone.
+    """
+    UserDataVersion.objects.filter(user_id__in=user_ids).update(version=F('version') + 1)
+
+
+def response_cache_key(user_id, action, query_params, version=None):
+    if version is None:
+        version = get_data_version(user_id)
+    params = sorted(
+        (name, sorted(query_params.getlist(name)))
+        for name in query_params
+    )
+    digest = hashlib.md5(
+        repr((timezone.now().date().isoformat(), get_catalog_version(), params)).encode()
+    ).hexdigest()
+    return f'{KEY_PREFIX}:{user_id}:{version}:{action}:{digest}'
+
+
+def _record(stat):
+    key = f'{KEY_PREFIX}:stats:{stat}'
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add() and incr()
+        cache.set(key, 1, timeout=None)
+
+
+def get_cache_stats():
+    stats = {
+        stat: cache.get(f'{KEY_PREFIX}:stats:{stat}', 0)
+        for stat in STATS_KEYS
+    }
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_rate'] = round(stats['hits'] / lookups, 4) if lookups else None
+    return stats
+
+
+def reset_cache_stats():
+    cache.delete_many([f'{KEY_PREFIX}:stats:{stat}' for stat in STATS_KEYS])
+
+
+def cached_action(view_method):
+    """
+    Serve a viewset action's successful responses from the versioned cache
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = response_cache_key(
+            request.user.pk, view_method.__name__, request.query_params,
+            # Already looked up by ConditionalGetMixin when computing the ETag
+            version=getattr(request, 'data_version', None),
+        )
+        data = cache.get(key)
+        if data is not None:
+            _record('hits')
+            return Response(data)
+
+        _record('misses')
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, timeout=settings.ANALYTICS_CACHE_TIMEOUT)
+        return response
+
+    return wrapper
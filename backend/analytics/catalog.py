@@ -0,0 +1,108 @@
+"""
+Process-local map from exercise id to the muscle groups it trains.
+
+The exercise catalogue barely changes, so instead of joining the
+muscle_groups M2M table on every analytics request each process keeps the
+mapping in memory, with the muscle groups of an exercise packed into an
+integer bitmask (bit i is the i-th muscle group by id).
+
+The map is tagged with a catalogue version stored in the cache. Catalogue
+writes replace the version after they commit (see analytics.signals) and the
+next lookup in any process sharing the cache rebuilds its map. Maps are also
+rebuilt after CATALOG_MAX_AGE seconds, for processes that do not share a
+cache, and when asked about an exercise created after they were built.
+"""
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+
+from workouts.models import Exercise, MuscleGroup
+
+CATALOG_VERSION_KEY = 'analytics:catalog_version'
+CATALOG_MAX_AGE = 300
+
+_lock = threading.Lock()
+_map = None
+
+
+class MuscleGroupMap:
+    def __init__(self, version, names, masks, max_exercise_id):
+        self.version = version
+        self.built_at = time.monotonic()
+        # Muscle group name for each bit position
+        self.names = names
+        # exercise_id -> bitmask; exercises without muscle groups are absent
+        self.masks = masks
+        self.max_exercise_id = max_exercise_id
+
+    def covers(self, exercise_ids):
+        return all(exercise_id <= self.max_exercise_id for exercise_id in exercise_ids)
+
+    def fan_out(self, weights):
+        """
+        Spread {exercise_id: weight} over muscle groups, returning
+        {muscle_group_name: total weight}
+        """
+        totals = defaultdict(int)
+        for exercise_id, weight in weights.items():
+            mask = self.masks.get(exercise_id, 0)
+            while mask:
+                low_bit = mask & -mask
+                totals[self.names[low_bit.bit_length() - 1]] += weight
+                mask ^= low_bit
+        return dict(totals)
+
+
+def get_catalog_version():
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        cache.add(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def invalidate_catalog():
+    """Replace the catalogue version once the current transaction commits"""
+    transaction.on_commit(
+        lambda: cache.set(CATALOG_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+    )
+
+
+def _build(version):
+    groups = list(MuscleGroup.objects.order_by('id').values_list('id', 'name'))
+    bits = {group_id: 1 << position for position, (group_id, _) in enumerate(groups)}
+
+    masks = defaultdict(int)
+    for exercise_id, group_id in Exercise.muscle_groups.through.objects.values_list(
+        'exercise_id', 'musclegroup_id'
+    ):
+        masks[exercise_id] |= bits[group_id]
+
+    max_exercise_id = Exercise.objects.aggregate(max_id=Max('id'))['max_id'] or 0
+    return MuscleGroupMap(version, [name for _, name in groups], dict(masks), max_exercise_id)
+
+
+def get_muscle_group_map(exercise_ids=()):
+    """
+    Return the current MuscleGroupMap, rebuilding it if it is stale or does
+    not know about some of exercise_ids
+    """
+    global _map
+    version = get_catalog_version()
+    current = _map
+    if (
+        current is None
+        or current.version != version
+        or time.monotonic() - current.built_at > CATALOG_MAX_AGE
+        or not current.covers(exercise_ids)
+    ):
+        with _lock:
+            if _map is current:
+                _map = _build(version)
+            current = _map
+    return current
@@ -0,0 +1,48 @@
+"""
+Concurrent execution of independent read queries.
+
+A database connection runs one query at a time, and Django's async ORM
+(acount(), aaggregate(), ...) runs every call through the same
+thread-sensitive executor on the request's connection. Gathering those calls
+therefore still executes the queries one after another. run_queries() runs
+each query on a thread of a small pool instead. Every pool thread holds its
+own connection, subject to CONN_MAX_AGE like request threads, so a request
+waits about as long as its slowest query instead of the sum of all of them.
+This works the same under WSGI and ASGI. It only pays off with persistent
+connections, so ANALYTICS_QUERY_WORKERS defaults to 0 without them.
+
+Queries run in sequence on the calling connection inside a transaction,
+whose uncommitted rows other connections cannot see, and on SQLite, which
+runs in-process with no network round trip for concurrency to hide.
+"""
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from woodshop_api.executors import get_executor
+
+
+def _run(query):
+    try:
+        return query()
+    finally:
+        close_old_connections()
+
+
+def _can_run_concurrently():
+    return (
+        settings.ANALYTICS_QUERY_WORKERS > 0
+        and not connection.in_atomic_block
+        and connection.vendor != 'sqlite'
+    )
+
+
+def run_queries(*queries):
+    """
+    Call each of the given zero-argument callables, concurrently when
+    possible, and return their results in order
+    """
+    if len(queries) < 2 or not _can_run_concurrently():
+        return [query() for query in queries]
+    executor = get_executor('analytics-query', settings.ANALYTICS_QUERY_WORKERS)
+    futures = [executor.submit(_run, query) for query in queries]
+    return [future.result() for future in futures]
@@ -0,0 +1,80 @@
+"""
+Conditional GET support for viewsets serving per-user training data.
+
+The ETag of a response is derived from the user's data version (see
+analytics.cache) plus everything else the response depends on, so it can be
+computed and matched against If-None-Match before any queryset is built or
+serialized. A matching request gets an empty 304 response.
+"""
+import hashlib
+
+from django.utils import timezone
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+from .cache import get_data_version
+from .catalog import get_catalog_version
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+    default_detail = ''
+
+
+class ConditionalGetMixin:
+    """
+    Add an ETag to successful GET responses and answer 304 Not Modified when
+    If-None-Match matches. Actions listed in etag_exempt_actions are skipped.
+    """
+    etag_exempt_actions = ()
+
+    def _compute_etag(self, request):
+        params = sorted(
+            (name, sorted(request.query_params.getlist(name)))
+            for name in request.query_params
+        )
+        digest = hashlib.md5(repr((
+            request.user.pk,
+            request.data_version,
+            request.path,
+            params,
+            request.accepted_media_type,
+            get_catalog_version(),
+            # Some responses default to ranges relative to today
+            timezone.now().date().isoformat(),
+        )).encode()).hexdigest()
+        return f'"{digest}"'
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        request.etag = None
+        if (
+            request.method not in ('GET', 'HEAD')
+            or not request.user.is_authenticated
+            or self.action in self.etag_exempt_actions
+        ):
+            return
+
+        request.data_version = get_data_version(request.user.pk)
+        request.etag = self._compute_etag(request)
+
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            # If-None-Match uses weak comparison
+            etags = {etag.removeprefix('W/') for etag in parse_etags(if_none_match)}
+            if '*' in etags or request.etag in etags:
+                raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        etag = getattr(request, 'etag', None)
+        if etag and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+        return response
@@ -0,0 +1,78 @@
+"""
+Largest-Triangle-Three-Buckets downsampling for chart series.
+
+LTTB keeps the first and last points and splits the rest into equal-size
+buckets. From each bucket it keeps the point forming the largest triangle
+with the point kept from the previous bucket and the average of the next
+bucket, so peaks and troughs survive while flat stretches collapse.
+
+Functions take NumPy-compatible x/y arrays and return sorted indices into
+them, so callers can pick the matching rows of whatever they serialize.
+"""
+import numpy as np
+
+MIN_POINTS = 3
+
+
+def lttb(x, y, max_points):
+    """Indices of at most max_points points chosen by LTTB"""
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    count = len(x)
+    if count <= max_points or max_points < MIN_POINTS:
+        return np.arange(count)
+
+    # max_points - 2 buckets over the points between the first and last;
+    # each bucket holds at least one point since count > max_points
+    edges = np.linspace(1, count - 1, max_points - 1).astype(np.intp)
+    selected = np.empty(max_points, dtype=np.intp)
+    selected[0] = 0
+    selected[-1] = count - 1
+
+    previous = 0
+    for bucket in range(max_points - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = count - 1, count
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+
+        # Twice the triangle area; the constant factor does not matter
+        areas = np.abs(
+            (x[previous] - average_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (average_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+
+    return selected
+
+
+def record_indices(y):
+    """Indices where y exceeds every earlier value, the first point included"""
+    y = np.asarray(y, dtype=np.float64)
+    if not len(y):
+        return np.arange(0)
+    running_best = np.fmax.accumulate(y)
+    return np.flatnonzero(np.concatenate(([True], y[1:] > running_best[:-1])))
+
+
+def downsample(x, y, max_points, keep=None):
+    """
+    Indices of at most max_points points: the indices in keep (at most half
+    the budget, highest y first) plus LTTB picks for the rest of it
+    """
+    x = np.asarray(x, dtype=np.float64)
+    # NaN would poison the triangle areas
+    y = np.nan_to_num(np.asarray(y, dtype=np.float64))
+    if len(x) <= max_points:
+        return np.arange(len(x))
+
+    keep = np.asarray(keep if keep is not None else [], dtype=np.intp)
+    budget = min(max_points // 2, max_points - MIN_POINTS)
+    if len(keep) > budget:
+        keep = keep[np.argsort(y[keep], kind='stable')[len(keep) - budget:]]
+
+    return np.union1d(lttb(x, y, max_points - len(keep)), keep)
@@ -0,0 +1,53 @@
+"""
+Vectorised strength formulas.
+
+Every function takes NumPy arrays of set weights and reps and returns an
+array of the same length. Sets with no reps, or with more reps than a
+formula holds for, yield NaN so they never count as a best.
+"""
+import numpy as np
+
+
+def epley(weights, reps):
+    return weights * (1 + reps / 30)
+
+
+# Brzycki tends to infinity at 37 reps and overestimates well before that
+BRZYCKI_MAX_REPS = 12
+
+
+def brzycki(weights, reps):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(reps <= BRZYCKI_MAX_REPS, weights * 36 / (37 - reps), np.nan)
+
+
+def lombardi(weights, reps):
+    return weights * np.power(reps, 0.10)
+
+
+ONE_REP_MAX_FORMULAS = {
+    'epley': epley,
+    'brzycki': brzycki,
+    'lombardi': lombardi,
+}
+
+
+def one_rep_max(weights, reps, formula='epley'):
+    """Estimated 1RM for each set"""
+    weights = np.asarray(weights, dtype=np.float64)
+    reps = np.asarray(reps, dtype=np.float64)
+    estimates = ONE_REP_MAX_FORMULAS[formula](weights, reps)
+    return np.where(reps > 0, estimates, np.nan)
+
+
+def best_by_group(keys, values):
+    """
+    Maximum value for each run of equal keys. `keys` must be sorted.
+    Returns (unique_keys, maxima); groups with only NaN values give NaN.
+    """
+    keys = np.asarray(keys)
+    values = np.asarray(values, dtype=np.float64)
+    if not len(keys):
+        return keys, values
+    unique_keys, starts = np.unique(keys, return_index=True)
+    return unique_keys, np.fmax.reduceat(values, starts)
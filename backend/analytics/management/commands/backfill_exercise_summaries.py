@@ -0,0 +1,55 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from analytics.models import DailyTrainingLoad, ExerciseDailySummary, UserTrainingSummary
+from analytics.rollups import rebuild_user_summaries
+from workouts.models import Workout
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the per-exercise daily rollups, daily training loads and '
+        'training summaries from logged sets'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='Only rebuild the given user id (may be repeated)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Rows fetched and written per batch'
+        )
+
+    def handle(self, *args, **options):
+        # Users without completed workouts may still have stale rollup rows
+        # left from workouts since un-completed or deleted
+        users = User.objects.filter(
+            Q(pk__in=Workout.objects.values('user_id'))
+            | Q(pk__in=ExerciseDailySummary.objects.values('user_id'))
+            | Q(pk__in=DailyTrainingLoad.objects.values('user_id'))
+            | Q(pk__in=UserTrainingSummary.objects.values('user_id'))
+        ).distinct()
+        if options['user_ids']:
+            users = users.filter(pk__in=options['user_ids'])
+
+        total_rows = 0
+        user_count = 0
+        for user_id in users.values_list('pk', flat=True).order_by('pk'):
+            rows = rebuild_user_summaries(user_id, batch_size=options['batch_size'])
+            total_rows += rows
+            user_count += 1
+            self.stdout.write(f'User {user_id}: {rows} daily summaries')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Rebuilt {total_rows} daily summaries for {user_count} users'
+        ))
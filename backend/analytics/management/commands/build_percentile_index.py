@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+
+from analytics.percentiles import rebuild_percentile_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds the cross-user strength percentile index from personal records '
+        'changed since the last build'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full',
+            action='store_true',
+            help='Rebuild every exercise and record type, not only changed ones'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Personal records fetched per database round trip'
+        )
+
+    def handle(self, *args, **options):
+        rebuilt = rebuild_percentile_index(
+            full=options['full'], chunk_size=options['chunk_size']
+        )
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {rebuilt} percentile index groups'))
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:42
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0001_initial'),
+        ('workouts', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExerciseDailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('session_count', models.PositiveIntegerField(default=0)),
+                ('set_count', models.PositiveIntegerField(default=0)),
+                ('total_reps', models.PositiveIntegerField(default=0)),
+                ('max_weight', models.DecimalField(decimal_places=2, default=0, max_digits=6)),
+                ('total_volume', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('best_one_rep_max', models.DecimalField(decimal_places=2, default=0, help_text='Best estimated 1RM of the day (Epley)', max_digits=8)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to='workouts.exercise')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='exercise_daily_summaries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['user', 'date'], name='analytics_e_user_id_b8533d_idx')],
+                'unique_together': {('user', 'exercise', 'date')},
+            },
+        ),
+    ]
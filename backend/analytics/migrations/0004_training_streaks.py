@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:47
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0003_usertrainingsummary_exercisefrequency'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertrainingsummary',
+            name='current_streak',
+            field=models.PositiveIntegerField(default=0, help_text='Length of the streak ending on last_active_date'),
+        ),
+        migrations.AddField(
+            model_name='usertrainingsummary',
+            name='last_active_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='usertrainingsummary',
+            name='longest_streak',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TrainingStreak',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_date', models.DateField()),
+                ('end_date', models.DateField()),
+                ('day_count', models.PositiveIntegerField(default=1)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='training_streaks', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-end_date'],
+                'indexes': [models.Index(fields=['user', '-end_date'], name='analytics_t_user_id_0b35d0_idx'), models.Index(fields=['user', '-day_count'], name='analytics_t_user_id_2de355_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-17 19:49
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0004_training_streaks'),
+        ('workouts', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='personalrecord',
+            name='is_automatic',
+            field=models.BooleanField(default=False, help_text='Detected from logged sets rather than entered by the user'),
+        ),
+        migrations.CreateModel(
+            name='PersonalRecordHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_type', models.CharField(choices=[('max_weight', 'Max Weight'), ('max_reps', 'Max Reps'), ('max_volume', 'Max Volume'), ('one_rep_max', 'One Rep Max (Estimated)')], max_length=20)),
+                ('value', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('date_achieved', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_record_history', to='workouts.exercise')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='personal_record_history', to=settings.AUTH_USER_MODEL)),
+                ('workout', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='personal_record_history', to='workouts.workout')),
+            ],
+            options={
+                'ordering': ['-date_achieved', '-id'],
+                'indexes': [models.Index(fields=['user', 'exercise', 'record_type'], name='analytics_p_user_id_722e03_idx')],
+            },
+        ),
+    ]
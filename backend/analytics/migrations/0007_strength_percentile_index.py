@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0006_user_data_version'),
+        ('workouts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StrengthPercentileIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('record_type', models.CharField(choices=[('max_weight', 'Max Weight'), ('max_reps', 'Max Reps'), ('max_volume', 'Max Volume'), ('one_rep_max', 'One Rep Max (Estimated)')], max_length=20)),
+                ('points', models.JSONField(default=list, help_text='Sorted record values, or evenly spaced quantiles of them for large groups')),
+                ('user_count', models.PositiveIntegerField(default=0)),
+                ('built_at', models.DateTimeField()),
+                ('exercise', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='percentile_indexes', to='workouts.exercise')),
+            ],
+            options={
+                'unique_together': {('exercise', 'record_type')},
+            },
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analytics', '0009_daily_training_load'),
+        ('workouts', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='personalrecord',
+            index=models.Index(fields=['user', '-date_achieved'], name='analytics_p_user_id_d5e901_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='personalrecordhistory',
+            index=models.Index(fields=['user', '-date_achieved'], name='analytics_p_user_id_7a68c6_idx'),
+        ),
+    ]
@@ -29,6 +29,10 @@ class PersonalRecord(models.Model):
         related_name='personal_records'
     )
     notes = models.TextField(blank=True, null=True)
+    is_automatic = models.BooleanField(
+        default=False,
+        help_text="Detected from logged sets rather than entered by the user"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -42,6 +46,37 @@ class PersonalRecord(models.Model):
         indexes = [
             models.Index(fields=['user', 'exercise']),
             models.Index(fields=['date_achieved']),
+            models.Index(fields=['user', '-date_achieved']),
+        ]
+
+
+class PersonalRecordHistory(models.Model):
+    """
+    Every time a detected personal record was beaten, in order
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='personal_record_history')
+    exercise = models.ForeignKey('workouts.Exercise', on_delete=models.CASCADE, related_name='personal_record_history')
+    record_type = models.CharField(max_length=20, choices=PersonalRecord.RECORD_TYPE_CHOICES)
+    value = models.DecimalField(max_digits=8, decimal_places=2)
+    date_achieved = models.DateField()
+    workout = models.ForeignKey(
+        'workouts.Workout',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='personal_record_history'
+    )
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.exercise.name}: {self.record_type} = {self.value}"
+
+    class Meta:
+        ordering = ['-date_achieved', '-id']
+        indexes = [
+            models.Index(fields=['user', 'exercise', 'record_type']),
+            models.Index(fields=['user', '-date_achieved']),
         ]
 
 
@@ -80,6 +115,12 @@ class ProgressSnapshot(models.Model):
     # Notes
     notes = models.TextField(blank=True, null=True)
     photo = models.ImageField(upload_to='progress_photos/', blank=True, null=True)
+    photo_thumbnails = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Generated thumbnails of photo (see woodshop_api.thumbnails)"
+    )
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -93,3 +134,158 @@ class ProgressSnapshot(models.Model):
         indexes = [
             models.Index(fields=['user', '-date']),
         ]
+
+
+class ExerciseDailySummary(models.Model):
+    """
+    Per-day rollup of a user's sets for one exercise in completed workouts.
+    Maintained from workout writes (see analytics.tracking) so progress
+    charts never have to scan raw sets.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='exercise_daily_summaries')
+    exercise = models.ForeignKey('workouts.Exercise', on_delete=models.CASCADE, related_name='daily_summaries')
+    date = models.DateField()
+
+    session_count = models.PositiveIntegerField(default=0)
+    set_count = models.PositiveIntegerField(default=0)
+    total_reps = models.PositiveIntegerField(default=0)
+    max_weight = models.DecimalField(max_digits=6, decimal_places=2, default=0)
+    total_volume = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    best_one_rep_max = models.DecimalField(
+        max_digits=8,
+        decimal_places=2,
+        default=0,
+        help_text="Best estimated 1RM of the day (Epley)"
+    )
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.exercise.name} on {self.date}"
+
+    class Meta:
+        ordering = ['date']
+        unique_together = ['user', 'exercise', 'date']
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
+
+
+class DailyTrainingLoad(models.Model):
+    """
+    Per-day totals of a user's sets across all exercises in completed
+    workouts, derived from ExerciseDailySummary. Rolling training-load ratios
+    are computed from these rows rather than from raw sets.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_training_loads')
+    date = models.DateField()
+
+    set_count = models.PositiveIntegerField(default=0)
+    total_reps = models.PositiveIntegerField(default=0)
+    total_volume = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - load on {self.date}"
+
+    class Meta:
+        ordering = ['date']
+        unique_together = ['user', 'date']
+
+
+class UserTrainingSummary(models.Model):
+    """
+    Lifetime training totals per user, kept as running counters so the
+    dashboard does not have to aggregate the full set history
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='training_summary')
+    total_workouts = models.PositiveIntegerField(default=0)
+    total_sets = models.PositiveIntegerField(default=0)
+    total_reps = models.PositiveIntegerField(default=0)
+    total_volume = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    # Streak state (see analytics.streaks)
+    last_active_date = models.DateField(null=True, blank=True)
+    current_streak = models.PositiveIntegerField(
+        default=0,
+        help_text="Length of the streak ending on last_active_date"
+    )
+    longest_streak = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.total_workouts} workouts"
+
+
+class ExerciseFrequency(models.Model):
+    """
+    Number of completed workout entries per exercise for a user
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='exercise_frequencies')
+    exercise = models.ForeignKey('workouts.Exercise', on_delete=models.CASCADE, related_name='frequencies')
+    session_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.exercise.name}: {self.session_count}"
+
+    class Meta:
+        unique_together = ['user', 'exercise']
+        indexes = [
+            models.Index(fields=['user', '-session_count']),
+        ]
+
+
+class TrainingStreak(models.Model):
+    """
+    A maximal run of completed workout days with at most two rest days
+    between consecutive workouts
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='training_streaks')
+    start_date = models.DateField()
+    end_date = models.DateField()
+    day_count = models.PositiveIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.day_count} days ending {self.end_date}"
+
+    class Meta:
+        ordering = ['-end_date']
+        indexes = [
+            models.Index(fields=['user', '-end_date']),
+            models.Index(fields=['user', '-day_count']),
+        ]
+
+
+class UserDataVersion(models.Model):
+    """
+    Counter bumped after every committed write to a user's training data.
+    Response caches and ETags are derived from it.
+    """
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='data_version')
+    version = models.PositiveBigIntegerField(default=1)
+
+    def __str__(self):
+        return f"{self.user.username} - v{self.version}"
+
+
+class StrengthPercentileIndex(models.Model):
+    """
+    Distribution of everyone's personal record values for one exercise and
+    record type, rebuilt periodically by the build_percentile_index command
+    """
+    exercise = models.ForeignKey('workouts.Exercise', on_delete=models.CASCADE, related_name='percentile_indexes')
+    record_type = models.CharField(max_length=20, choices=PersonalRecord.RECORD_TYPE_CHOICES)
+    points = models.JSONField(
+        default=list,
+        help_text="Sorted record values, or evenly spaced quantiles of them for large groups"
+    )
+    user_count = models.PositiveIntegerField(default=0)
+    built_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.exercise.name}: {self.record_type} ({self.user_count} users)"
+
+    class Meta:
+        unique_together = ['exercise', 'record_type']
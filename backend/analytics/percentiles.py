@@ -0,0 +1,142 @@
+"""
+Cross-user percentile index of personal record values.
+
+For every (exercise, record_type) the index stores the sorted values of all
+users' personal records, or SKETCH_SIZE evenly spaced quantiles of them once
+a group grows larger than that, so lookups are a bisect over at most
+SKETCH_SIZE points. Weights are entered in each user's own unit, so values
+of the weight-based record types are converted to pounds, both when the
+index is built and when a user's record is looked up in it.
+
+The index is rebuilt by the build_percentile_index command. An incremental
+build only recomputes groups whose records, or their users (who may have
+switched units), were written since the previous build, or whose record
+count no longer matches (deleted records leave no updated_at behind).
+"""
+from bisect import bisect_left
+from datetime import timedelta
+from itertools import groupby
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from .models import PersonalRecord, StrengthPercentileIndex
+
+SKETCH_SIZE = 1000
+
+# Record types measured in the user's weight unit; max_reps is unitless
+WEIGHT_RECORD_TYPES = ('max_weight', 'one_rep_max', 'max_volume')
+INDEX_UNIT = 'lb'
+POUNDS_PER_KILOGRAM = 2.20462262185
+
+# Records committed by transactions that started before a build can carry an
+# updated_at older than that build; look back this far to pick them up
+REBUILD_OVERLAP = timedelta(minutes=10)
+
+
+def build_points(values):
+    """
+    Sorted values, or SKETCH_SIZE quantiles taken at the middle of equal rank
+    bands, so bisect_left(points, v) / len(points) estimates the share of
+    values below v either way
+    """
+    values = np.sort(np.asarray(values, dtype=np.float64))
+    if len(values) > SKETCH_SIZE:
+        values = np.quantile(values, (np.arange(SKETCH_SIZE) + 0.5) / SKETCH_SIZE)
+    return [round(value, 2) for value in values.tolist()]
+
+
+def to_index_unit(value, record_type, weight_unit):
+    """A record value, entered in weight_unit, in the unit the index is built in"""
+    value = float(value)
+    if record_type in WEIGHT_RECORD_TYPES and weight_unit != INDEX_UNIT:
+        # Rounded like the points, so a user's own value ranks against itself
+        value = round(value * POUNDS_PER_KILOGRAM, 2)
+    return value
+
+
+def percentile_rank(points, value):
+    """Percentage of indexed values strictly below value"""
+    if not points:
+        return None
+    return round(100 * bisect_left(points, float(value)) / len(points), 1)
+
+
+def _changed_groups(full):
+    """(exercise_id, record_type) groups that need rebuilding, and current counts"""
+    counts = {
+        (item['exercise_id'], item['record_type']): item['count']
+        for item in PersonalRecord.objects.values('exercise_id', 'record_type').annotate(
+            count=Count('id')
+        ).order_by()
+    }
+    indexed = {
+        (item['exercise_id'], item['record_type']): item['user_count']
+        for item in StrengthPercentileIndex.objects.values('exercise_id', 'record_type', 'user_count')
+    }
+    if full:
+        return set(counts) | set(indexed), counts
+
+    changed = {
+        key for key in set(counts) | set(indexed)
+        if counts.get(key, 0) != indexed.get(key, 0)
+    }
+    last_build = StrengthPercentileIndex.objects.aggregate(last=Max('built_at'))['last']
+    if last_build is None:
+        return changed | set(counts), counts
+    changed.update(
+        PersonalRecord.objects.filter(
+            Q(updated_at__gte=last_build - REBUILD_OVERLAP)
+            | Q(user__updated_at__gte=last_build - REBUILD_OVERLAP)
+        ).values_list('exercise_id', 'record_type').distinct().order_by()
+    )
+    return changed, counts
+
+
+def rebuild_percentile_index(full=False, chunk_size=2000):
+    """
+    Rebuild the index groups that changed since the last build (all groups
+    when full). Returns the number of groups rebuilt.
+    """
+    built_at = timezone.now()
+    groups, counts = _changed_groups(full)
+    if not groups:
+        return 0
+
+    emptied = [key for key in groups if not counts.get(key)]
+    exercise_ids = {key[0] for key in groups if counts.get(key)}
+    rows = PersonalRecord.objects.filter(exercise_id__in=exercise_ids).order_by(
+        'exercise_id', 'record_type'
+    ).values_list(
+        'exercise_id', 'record_type', 'value', 'user__weight_unit'
+    ).iterator(chunk_size=chunk_size)
+
+    indexes = []
+    for key, group in groupby(rows, key=lambda row: row[:2]):
+        if key not in groups:
+            continue
+        values = [to_index_unit(value, key[1], unit) for _, _, value, unit in group]
+        indexes.append(StrengthPercentileIndex(
+            exercise_id=key[0],
+            record_type=key[1],
+            points=build_points(values),
+            user_count=len(values),
+            built_at=built_at,
+        ))
+
+    with transaction.atomic():
+        for exercise_id, record_type in emptied:
+            StrengthPercentileIndex.objects.filter(
+                exercise_id=exercise_id, record_type=record_type
+            ).delete()
+        StrengthPercentileIndex.objects.bulk_create(
+            indexes,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=['exercise', 'record_type'],
+            update_fields=['points', 'user_count', 'built_at'],
+        )
+
+    return len(indexes) + len(emptied)
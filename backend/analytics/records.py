@@ -0,0 +1,202 @@
+"""
+Server-side personal record detection.
+
+Both paths share _evaluate(), a single pass over (exercise_id, workout_id,
+date, weight, reps) rows in chronological order:
+
+- detect_personal_records() runs when a workout is completed and checks only
+  that workout's sets against the stored bests.
+- recompute_personal_records() replays an exercise's full history after sets
+  are edited or deleted, rebuilding both the records and their history.
+
+max_volume is the total weight x reps for an exercise within one workout;
+one_rep_max uses the Epley estimate. Missed sets and sets without any
+reps set no record.
+"""
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+
+from workouts.models import Set
+from . import tracking
+from .models import PersonalRecord, PersonalRecordHistory
+
+CENT = Decimal('0.01')
+
+
+def epley_one_rep_max(weight, reps):
+    return (weight * (1 + Decimal(reps) / 30)).quantize(CENT)
+
+
+def _evaluate(rows, bests):
+    """
+    Walk rows in chronological order and return the improvements over `bests`
+    (updated in place) as {(exercise_id, record_type, workout_id): (value, date)}.
+    Only the final improvement within each workout is kept.
+    """
+    improvements = {}
+    volumes = defaultdict(Decimal)
+
+    def consider(exercise_id, record_type, value, workout_id, day):
+        key = (exercise_id, record_type)
+        if value > 0 and value > bests.get(key, 0):
+            bests[key] = value
+            improvements[(exercise_id, record_type, workout_id)] = (value, day)
+
+    current_workout = None
+    for exercise_id, workout_id, day, weight, reps in rows:
+        if workout_id != current_workout:
+            volumes.clear()
+            current_workout = workout_id
+        if reps <= 0:
+            continue
+        volumes[exercise_id] += weight * reps
+
+        consider(exercise_id, 'max_weight', weight, workout_id, day)
+        consider(exercise_id, 'max_reps', Decimal(reps), workout_id, day)
+        consider(exercise_id, 'one_rep_max', epley_one_rep_max(weight, reps), workout_id, day)
+        consider(exercise_id, 'max_volume', volumes[exercise_id], workout_id, day)
+
+    return improvements
+
+
+def _history(user_id, improvements):
+    return [
+        PersonalRecordHistory(
+            user_id=user_id,
+            exercise_id=exercise_id,
+            record_type=record_type,
+            value=value,
+            date_achieved=day,
+            workout_id=workout_id,
+        )
+        for (exercise_id, record_type, workout_id), (value, day) in improvements.items()
+    ]
+
+
+def _upsert(records):
+    PersonalRecord.objects.bulk_create(
+        records,
+        update_conflicts=True,
+        unique_fields=['user', 'exercise', 'record_type'],
+        update_fields=['value', 'date_achieved', 'workout', 'is_automatic', 'updated_at'],
+    )
+
+
+def detect_personal_records(workout):
+    """
+    Compare every set of a completed workout with the user's current bests in
+    one pass and upsert the records it beats. Returns the new records.
+    """
+    rows = list(
+        Set.objects.filter(
+            workout_exercise__workout=workout, completed=True, reps__gt=0
+        ).values_list(
+            'workout_exercise__exercise_id', 'weight', 'reps'
+        ).order_by('workout_exercise__order', 'set_number')
+    )
+    if not rows:
+        return []
+
+    exercise_ids = {row[0] for row in rows}
+    bests = {
+        (exercise_id, record_type): value
+        for exercise_id, record_type, value in PersonalRecord.objects.filter(
+            user_id=workout.user_id, exercise_id__in=exercise_ids
+        ).values_list('exercise_id', 'record_type', 'value')
+    }
+    improvements = _evaluate(
+        ((exercise_id, workout.pk, workout.date, weight, reps) for exercise_id, weight, reps in rows),
+        bests
+    )
+    if not improvements:
+        return []
+
+    with transaction.atomic():
+        _upsert([
+            PersonalRecord(
+                user_id=workout.user_id,
+                exercise_id=exercise_id,
+                record_type=record_type,
+                value=value,
+                date_achieved=day,
+                workout_id=workout_id,
+                is_automatic=True,
+            )
+            for (exercise_id, record_type, workout_id), (value, day) in improvements.items()
+        ])
+        PersonalRecordHistory.objects.bulk_create(_history(workout.user_id, improvements))
+        # Bumped by the same flush as the rollups of the workout's writes
+        tracking.mark_user_changed(workout.user_id)
+
+    won = {(exercise_id, record_type) for exercise_id, record_type, _ in improvements}
+    return [
+        record for record in PersonalRecord.objects.filter(
+            user_id=workout.user_id, workout=workout, exercise_id__in=exercise_ids
+        ).select_related('exercise')
+        if (record.exercise_id, record.record_type) in won
+    ]
+
+
+def recompute_personal_records(user_id, exercise_ids, chunk_size=2000):
+    """
+    Rebuild detected records and their history for some of a user's exercises
+    from all of their completed sets. Records entered by hand are only
+    replaced when the logged history beats them.
+    """
+    exercise_ids = set(exercise_ids)
+    rows = Set.objects.filter(
+        workout_exercise__workout__user_id=user_id,
+        workout_exercise__workout__completed=True,
+        workout_exercise__exercise_id__in=exercise_ids,
+        completed=True,
+        reps__gt=0,
+    ).order_by(
+        'workout_exercise__workout__date', 'workout_exercise__workout_id'
+    ).values_list(
+        'workout_exercise__exercise_id',
+        'workout_exercise__workout_id',
+        'workout_exercise__workout__date',
+        'weight',
+        'reps',
+    ).iterator(chunk_size=chunk_size)
+
+    improvements = _evaluate(rows, {})
+    final = {}
+    for (exercise_id, record_type, workout_id), (value, day) in improvements.items():
+        final[(exercise_id, record_type)] = (value, day, workout_id)
+
+    with transaction.atomic():
+        existing = {
+            (record.exercise_id, record.record_type): record
+            for record in PersonalRecord.objects.select_for_update().filter(
+                user_id=user_id, exercise_id__in=exercise_ids
+            )
+        }
+        stale = [
+            record.pk for key, record in existing.items()
+            if record.is_automatic and key not in final
+        ]
+        if stale:
+            PersonalRecord.objects.filter(pk__in=stale).delete()
+
+        records = []
+        for (exercise_id, record_type), (value, day, workout_id) in final.items():
+            record = existing.get((exercise_id, record_type))
+            if record and not record.is_automatic and record.value >= value:
+                continue
+            records.append(PersonalRecord(
+                user_id=user_id,
+                exercise_id=exercise_id,
+                record_type=record_type,
+                value=value,
+                date_achieved=day,
+                workout_id=workout_id,
+                is_automatic=True,
+            ))
+        if records:
+            _upsert(records)
+
+        PersonalRecordHistory.objects.filter(user_id=user_id, exercise_id__in=exercise_ids).delete()
+        PersonalRecordHistory.objects.bulk_create(_history(user_id, improvements), batch_size=1000)
@@ -0,0 +1,328 @@
+"""
+Maintenance of the ExerciseDailySummary rollup table and the per-user
+counters derived from it.
+
+Rollup rows are always recomputed from the underlying sets for the affected
+(user_id, exercise_id, date) keys, so refreshing a key twice is harmless.
+DailyTrainingLoad rows are likewise recomputed from the rollup rows of the
+affected (user_id, date) days. UserTrainingSummary and ExerciseFrequency are
+adjusted by the difference between the old and new rollup rows inside the
+same transaction.
+"""
+from collections import defaultdict
+from decimal import Decimal
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import (
+    Case, Count, ExpressionWrapper, F, FloatField, Max, Q, Sum, Value, When,
+)
+from django.db.models.functions import Cast
+from django.utils import timezone
+
+from workouts.models import Workout, WorkoutExercise
+from .models import (
+    DailyTrainingLoad, ExerciseDailySummary, ExerciseFrequency, UserTrainingSummary,
+)
+from .streaks import rebuild_streaks
+
+# Keys per OR-filter so the generated SQL stays a reasonable size
+KEY_BATCH_SIZE = 200
+
+SUMMARY_FIELDS = [
+    'session_count',
+    'set_count',
+    'total_reps',
+    'max_weight',
+    'total_volume',
+    'best_one_rep_max',
+]
+
+LOAD_FIELDS = [
+    'set_count',
+    'total_reps',
+    'total_volume',
+]
+
+# Epley: weight * (1 + reps / 30); sets without reps do not count. Computed
+# in floating point since SQLite stores whole-number decimals as integers and
+# would otherwise truncate reps / 30.
+EPLEY_ONE_REP_MAX = Case(
+    When(
+        sets__reps__gt=0,
+        then=ExpressionWrapper(
+            Cast('sets__weight', FloatField()) * (Value(30.0) + Cast('sets__reps', FloatField())) / Value(30.0),
+            output_field=FloatField()
+        )
+    ),
+    output_field=FloatField()
+)
+
+
+def _chunks(items, size):
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _key_filter(keys, user_field, exercise_field, date_field):
+    key_filter = Q()
+    for user_id, exercise_id, day in keys:
+        key_filter |= Q(**{user_field: user_id, exercise_field: exercise_id, date_field: day})
+    return key_filter
+
+
+def _day_filter(user_days):
+    day_filter = Q()
+    for user_id, day in user_days:
+        day_filter |= Q(user_id=user_id, date=day)
+    return day_filter
+
+
+def _aggregate_days(queryset):
+    """Group workout exercises of completed workouts into per-day rollup values"""
+    return queryset.filter(workout__completed=True).values(
+        'workout__user_id', 'exercise_id', 'workout__date'
+    ).annotate(
+        session_count=Count('id', distinct=True),
+        set_count=Count('sets'),
+        total_reps=Sum('sets__reps'),
+        max_weight=Max('sets__weight'),
+        total_volume=Sum(F('sets__weight') * F('sets__reps')),
+        best_one_rep_max=Max(EPLEY_ONE_REP_MAX),
+    ).order_by()
+
+
+def _to_summary(item):
+    return ExerciseDailySummary(
+        user_id=item['workout__user_id'],
+        exercise_id=item['exercise_id'],
+        date=item['workout__date'],
+        session_count=item['session_count'],
+        set_count=item['set_count'],
+        total_reps=item['total_reps'] or 0,
+        max_weight=item['max_weight'] or 0,
+        total_volume=item['total_volume'] or 0,
+        best_one_rep_max=Decimal(item['best_one_rep_max'] or 0).quantize(Decimal('0.01')),
+    )
+
+
+def _upsert(summaries):
+    ExerciseDailySummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['user', 'exercise', 'date'],
+        update_fields=SUMMARY_FIELDS + ['updated_at'],
+    )
+
+
+def _aggregate_loads(queryset):
+    """Sum rollup rows into per-user, per-day training loads"""
+    return queryset.values('user_id', 'date').annotate(
+        set_count=Sum('set_count'),
+        total_reps=Sum('total_reps'),
+        total_volume=Sum('total_volume'),
+    ).order_by()
+
+
+def _to_load(item):
+    return DailyTrainingLoad(
+        user_id=item['user_id'],
+        date=item['date'],
+        set_count=item['set_count'] or 0,
+        total_reps=item['total_reps'] or 0,
+        total_volume=item['total_volume'] or 0,
+    )
+
+
+def _upsert_loads(loads):
+    DailyTrainingLoad.objects.bulk_create(
+        loads,
+        update_conflicts=True,
+        unique_fields=['user', 'date'],
+        update_fields=LOAD_FIELDS + ['updated_at'],
+    )
+
+
+def refresh_training_loads(user_days):
+    """
+    Recompute the DailyTrainingLoad rows for the given (user_id, date) days
+    from the rollup table. Days without any rollup rows are deleted.
+    """
+    user_days = set(user_days)
+    loads = []
+    for chunk in _chunks(user_days, KEY_BATCH_SIZE):
+        loads.extend(
+            _to_load(item)
+            for item in _aggregate_loads(ExerciseDailySummary.objects.filter(_day_filter(chunk)))
+        )
+
+    stale = user_days - {(load.user_id, load.date) for load in loads}
+    for chunk in _chunks(stale, KEY_BATCH_SIZE):
+        DailyTrainingLoad.objects.filter(_day_filter(chunk)).delete()
+    if loads:
+        _upsert_loads(loads)
+    return loads
+
+
+def refresh_exercise_days(keys):
+    """
+    Recompute the rollup rows for the given (user_id, exercise_id, date) keys.
+    Keys that no longer have any completed workout exercise are deleted.
+    """
+    keys = set(keys)
+    if not keys:
+        return []
+
+    with transaction.atomic():
+        # Serialises concurrent refreshes for the same user so deltas are not
+        # applied twice against the same previous rows
+        locked_user_ids = lock_training_summaries({key[0] for key in keys})
+
+        previous = {}
+        summaries = []
+        for chunk in _chunks(keys, KEY_BATCH_SIZE):
+            for row in ExerciseDailySummary.objects.filter(
+                _key_filter(chunk, 'user_id', 'exercise_id', 'date')
+            ):
+                previous[(row.user_id, row.exercise_id, row.date)] = row
+            summaries.extend(
+                _to_summary(item)
+                for item in _aggregate_days(WorkoutExercise.objects.filter(
+                    _key_filter(chunk, 'workout__user_id', 'exercise_id', 'workout__date')
+                ))
+            )
+
+        stale = keys - {(s.user_id, s.exercise_id, s.date) for s in summaries}
+        for chunk in _chunks(stale, KEY_BATCH_SIZE):
+            ExerciseDailySummary.objects.filter(
+                _key_filter(chunk, 'user_id', 'exercise_id', 'date')
+            ).delete()
+        if summaries:
+            _upsert(summaries)
+        refresh_training_loads((user_id, day) for user_id, _, day in keys)
+
+        _apply_deltas(locked_user_ids, previous.values(), summaries)
+
+    return summaries
+
+
+def lock_training_summaries(user_ids):
+    """Lock existing UserTrainingSummary rows and return the ids of their users"""
+    return set(
+        UserTrainingSummary.objects.select_for_update().filter(
+            user_id__in=user_ids
+        ).order_by('user_id').values_list('user_id', flat=True)
+    )
+
+
+def _apply_deltas(user_ids, previous, current):
+    """
+    Shift the counters of the given users by (current - previous) rollup rows.
+    Users without a summary row are skipped; theirs is built from the rollup
+    on first read.
+    """
+    totals = defaultdict(lambda: [0, 0, Decimal('0')])
+    frequencies = defaultdict(int)
+    for sign, rows in ((-1, previous), (1, current)):
+        for row in rows:
+            if row.user_id not in user_ids:
+                continue
+            total = totals[row.user_id]
+            total[0] += sign * row.set_count
+            total[1] += sign * row.total_reps
+            total[2] += sign * Decimal(row.total_volume)
+            frequencies[(row.user_id, row.exercise_id)] += sign * row.session_count
+
+    for user_id, (sets, reps, volume) in totals.items():
+        if sets or reps or volume:
+            UserTrainingSummary.objects.filter(user_id=user_id).update(
+                total_sets=F('total_sets') + sets,
+                total_reps=F('total_reps') + reps,
+                total_volume=F('total_volume') + volume,
+            )
+
+    for (user_id, exercise_id), delta in frequencies.items():
+        if not delta:
+            continue
+        updated = ExerciseFrequency.objects.filter(
+            user_id=user_id, exercise_id=exercise_id
+        ).update(session_count=F('session_count') + delta)
+        if not updated and delta > 0:
+            ExerciseFrequency.objects.create(
+                user_id=user_id, exercise_id=exercise_id, session_count=delta
+            )
+
+
+def adjust_workout_count(user_id, delta):
+    """Shift total_workouts for a user whose summary row already exists"""
+    UserTrainingSummary.objects.filter(user_id=user_id).update(
+        total_workouts=F('total_workouts') + delta
+    )
+
+
+def rebuild_training_summary(user_id):
+    """
+    Rebuild a user's UserTrainingSummary and ExerciseFrequency rows from the
+    rollup table, and their streaks from the workout dates. Returns the summary.
+    """
+    with transaction.atomic():
+        totals = ExerciseDailySummary.objects.filter(user_id=user_id).aggregate(
+            sets=Sum('set_count'),
+            reps=Sum('total_reps'),
+            volume=Sum('total_volume'),
+        )
+        summary, _ = UserTrainingSummary.objects.update_or_create(
+            user_id=user_id,
+            defaults={
+                'total_workouts': Workout.objects.filter(user_id=user_id, completed=True).count(),
+                'total_sets': totals['sets'] or 0,
+                'total_reps': totals['reps'] or 0,
+                'total_volume': totals['volume'] or 0,
+            }
+        )
+
+        rebuild_streaks(summary)
+
+        ExerciseFrequency.objects.filter(user_id=user_id).delete()
+        ExerciseFrequency.objects.bulk_create(
+            ExerciseFrequency(
+                user_id=user_id,
+                exercise_id=item['exercise_id'],
+                session_count=item['session_count'],
+            )
+            for item in ExerciseDailySummary.objects.filter(user_id=user_id).values(
+                'exercise_id'
+            ).annotate(session_count=Sum('session_count')).order_by()
+            if item['session_count']
+        )
+
+    return summary
+
+
+def rebuild_user_summaries(user_id, batch_size=1000):
+    """
+    Recompute every rollup row for one user, then rebuild the daily loads and
+    counters derived from them. Returns the number of rollup rows written.
+    """
+    aggregates = _aggregate_days(
+        WorkoutExercise.objects.filter(workout__user_id=user_id)
+    ).iterator(chunk_size=batch_size)
+
+    written = 0
+    with transaction.atomic():
+        started_at = timezone.now()
+        for chunk in _chunks(aggregates, batch_size):
+            _upsert([_to_summary(item) for item in chunk])
+            written += len(chunk)
+        # Rows not rewritten above no longer have any completed sets
+        ExerciseDailySummary.objects.filter(user_id=user_id, updated_at__lt=started_at).delete()
+
+        loads = _aggregate_loads(ExerciseDailySummary.objects.filter(user_id=user_id))
+        for chunk in _chunks(loads.iterator(chunk_size=batch_size), batch_size):
+            _upsert_loads([_to_load(item) for item in chunk])
+        DailyTrainingLoad.objects.filter(user_id=user_id, updated_at__lt=started_at).delete()
+
+        rebuild_training_summary(user_id)
+
+    return written
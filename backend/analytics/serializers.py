@@ -1,6 +1,8 @@
 from rest_framework import serializers
-from .models import PersonalRecord, ProgressSnapshot
+from .models import PersonalRecord, PersonalRecordHistory, ProgressSnapshot
 from workouts.serializers import ExerciseSerializer
+from woodshop_api.images import IngestedImageField
+from woodshop_api.thumbnails import thumbnail_urls
 
 
 class PersonalRecordSerializer(serializers.ModelSerializer):
@@ -15,9 +17,9 @@ class PersonalRecordSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'user', 'user_username', 'exercise', 'exercise_detail',
             'record_type', 'value', 'date_achieved', 'workout', 'notes',
-            'created_at', 'updated_at'
+            'is_automatic', 'created_at', 'updated_at'
         ]
-        read_only_fields = ['user', 'created_at', 'updated_at']
+        read_only_fields = ['user', 'is_automatic', 'created_at', 'updated_at']
 
 
 class PersonalRecordListSerializer(serializers.ModelSerializer):
@@ -31,7 +33,21 @@ class PersonalRecordListSerializer(serializers.ModelSerializer):
         model = PersonalRecord
         fields = [
             'id', 'exercise', 'exercise_name', 'record_type',
-            'record_type_display', 'value', 'date_achieved'
+            'record_type_display', 'value', 'date_achieved', 'is_automatic'
+        ]
+
+
+class PersonalRecordHistorySerializer(serializers.ModelSerializer):
+    """
+    Serializer for the progression of detected personal records
+    """
+    exercise_name = serializers.CharField(source='exercise.name', read_only=True)
+
+    class Meta:
+        model = PersonalRecordHistory
+        fields = [
+            'id', 'exercise', 'exercise_name', 'record_type',
+            'value', 'date_achieved', 'workout'
         ]
 
 
@@ -40,6 +56,8 @@ class ProgressSnapshotSerializer(serializers.ModelSerializer):
     Serializer for Progress Snapshots (body metrics)
     """
     user_username = serializers.CharField(source='user.username', read_only=True)
+    photo = IngestedImageField(required=False, allow_null=True)
+    photo_thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = ProgressSnapshot
@@ -47,11 +65,15 @@ class ProgressSnapshotSerializer(serializers.ModelSerializer):
             'id', 'user', 'user_username', 'date',
             'body_weight', 'body_fat_percentage',
             'neck', 'chest', 'waist', 'hips', 'biceps', 'thighs', 'calves',
-            'notes', 'photo',
+            'notes', 'photo', 'photo_thumbnails',
             'created_at', 'updated_at'
         ]
         read_only_fields = ['user', 'created_at', 'updated_at']
 
+    def get_photo_thumbnails(self, obj):
+        """URLs by size and format; empty until generated"""
+        return thumbnail_urls(obj, 'photo', self.context.get('request'))
+
 
 class ProgressSnapshotListSerializer(serializers.ModelSerializer):
     """
@@ -73,7 +95,7 @@ class ExerciseProgressSerializer(serializers.Serializer):
     max_weight = serializers.DecimalField(max_digits=6, decimal_places=2)
     total_reps = serializers.IntegerField()
     total_volume = serializers.DecimalField(max_digits=10, decimal_places=2)
-    one_rep_max = serializers.DecimalField(max_digits=6, decimal_places=2, required=False)
+    one_rep_max = serializers.DecimalField(max_digits=8, decimal_places=2, required=False)
 
 
 class WorkoutStatsSerializer(serializers.Serializer):
@@ -88,3 +110,18 @@ class WorkoutStatsSerializer(serializers.Serializer):
     total_reps = serializers.IntegerField()
     most_frequent_exercise = serializers.CharField(required=False)
     current_streak = serializers.IntegerField()
+    longest_streak = serializers.IntegerField()
+
+
+class RecordPercentileSerializer(serializers.Serializer):
+    """
+    Serializer for where a user's personal record ranks among all users
+    """
+    exercise = serializers.IntegerField()
+    exercise_name = serializers.CharField()
+    record_type = serializers.CharField()
+    value = serializers.DecimalField(max_digits=8, decimal_places=2)
+    percentile = serializers.FloatField()
+    top_percent = serializers.FloatField()
+    user_count = serializers.IntegerField()
+    built_at = serializers.DateTimeField()
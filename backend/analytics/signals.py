@@ -0,0 +1,148 @@
+"""
+Signal handlers keeping derived analytics data, the per-user data version
+and the exercise catalogue version in step with writes
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from woodshop_api.thumbnails import thumbnails_updated
+from workouts.models import Exercise, MuscleGroup, Workout, WorkoutExercise, Set
+from . import tracking
+from .cache import bump_data_version
+from .catalog import invalidate_catalog
+from .models import PersonalRecord, ProgressSnapshot
+from .rollups import adjust_workout_count
+from .streaks import update_streaks
+
+
+@receiver(pre_save, sender=Workout)
+def capture_workout_state(sender, instance, **kwargs):
+    """Remember the stored date/completed values so post_save can diff them"""
+    instance._analytics_previous = None
+    if instance.pk:
+        instance._analytics_previous = Workout.objects.filter(pk=instance.pk).values(
+            'date', 'completed'
+        ).first()
+
+
+@receiver(post_save, sender=Workout)
+def workout_saved(sender, instance, created, **kwargs):
+    """Keep the workout counter and streaks current and refresh exercise days when needed"""
+    tracking.mark_user_changed(instance.user_id)
+    previous = getattr(instance, '_analytics_previous', None)
+    if created or previous is None:
+        if instance.completed:
+            adjust_workout_count(instance.user_id, 1)
+            update_streaks(instance.user_id, added=instance.date)
+        return
+    if previous['date'] == instance.date and previous['completed'] == instance.completed:
+        return
+    if not (previous['completed'] or instance.completed):
+        return
+
+    if previous['completed'] != instance.completed:
+        adjust_workout_count(instance.user_id, 1 if instance.completed else -1)
+    update_streaks(
+        instance.user_id,
+        added=instance.date if instance.completed else None,
+        removed=previous['date'] if previous['completed'] else None,
+    )
+
+    dates = {previous['date'], instance.date}
+    exercise_ids = set(
+        WorkoutExercise.objects.filter(workout=instance).values_list('exercise_id', flat=True)
+    )
+    tracking.mark_dirty(
+        (instance.user_id, exercise_id, day)
+        for exercise_id in exercise_ids
+        for day in dates
+    )
+    # Newly completed workouts are checked by detect_personal_records; anything
+    # else may have invalidated records set by this workout
+    if previous['completed']:
+        tracking.mark_records_dirty((instance.user_id, exercise_id) for exercise_id in exercise_ids)
+
+
+@receiver(pre_delete, sender=Workout)
+def workout_deleting(sender, instance, **kwargs):
+    """Resolve all of the workout's exercises up front for the cascade that follows"""
+    instance._analytics_previous = Workout.objects.filter(pk=instance.pk).values(
+        'date', 'completed'
+    ).first()
+    tracking.remember_workout_exercises(tracking.workout_exercise_rows(workout=instance))
+
+
+@receiver(post_delete, sender=Workout)
+def workout_deleted(sender, instance, **kwargs):
+    tracking.mark_user_changed(instance.user_id)
+    previous = getattr(instance, '_analytics_previous', None)
+    if previous and previous['completed']:
+        adjust_workout_count(instance.user_id, -1)
+        update_streaks(instance.user_id, removed=previous['date'])
+
+
+@receiver(pre_save, sender=WorkoutExercise)
+def capture_workout_exercise_state(sender, instance, **kwargs):
+    instance._analytics_previous = None
+    if instance.pk:
+        instance._analytics_previous = tracking.resolve_workout_exercise(instance.pk)
+
+
+@receiver(post_save, sender=WorkoutExercise)
+def workout_exercise_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_analytics_previous', None)
+    if previous and previous[3]:
+        tracking.mark_dirty([previous[:3]])
+    tracking.mark_workout_exercise(instance.pk)
+
+
+@receiver(pre_delete, sender=WorkoutExercise)
+def workout_exercise_deleting(sender, instance, **kwargs):
+    resolved = tracking.resolve_workout_exercise(instance.pk)
+    if resolved:
+        tracking.remember_workout_exercises([(instance.pk, *resolved)])
+        tracking.mark_workout_exercise(instance.pk)
+
+
+@receiver(pre_save, sender=Set)
+def capture_set_state(sender, instance, **kwargs):
+    instance._analytics_previous = None
+    if instance.pk:
+        instance._analytics_previous = Set.objects.filter(pk=instance.pk).values_list(
+            'workout_exercise_id', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Set)
+def set_saved(sender, instance, **kwargs):
+    previous = getattr(instance, '_analytics_previous', None)
+    if previous and previous != instance.workout_exercise_id:
+        tracking.mark_workout_exercise(previous)
+    tracking.mark_workout_exercise(instance.workout_exercise_id)
+
+
+@receiver(post_delete, sender=Set)
+def set_deleted(sender, instance, **kwargs):
+    tracking.mark_workout_exercise(instance.workout_exercise_id)
+
+
+@receiver([post_save, post_delete], sender=PersonalRecord)
+@receiver([post_save, post_delete], sender=ProgressSnapshot)
+def user_metric_changed(sender, instance, **kwargs):
+    tracking.mark_user_changed(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Exercise)
+@receiver([post_save, post_delete], sender=MuscleGroup)
+@receiver(m2m_changed, sender=Exercise.muscle_groups.through)
+def catalog_changed(sender, action=None, **kwargs):
+    """Rebuild in-memory muscle group maps after catalogue edits"""
+    # m2m_changed fires both before and after the change; after is enough
+    if action is None or action.startswith('post_'):
+        invalidate_catalog()
+
+
+@receiver(thumbnails_updated, sender=ProgressSnapshot)
+def snapshot_thumbnails_updated(sender, pk, **kwargs):
+    """Cached dashboards embed the snapshot, but thumbnails land after its commit"""
+    bump_data_version(ProgressSnapshot.objects.filter(pk=pk).values('user_id'))
@@ -0,0 +1,124 @@
+"""
+Incremental maintenance of workout streaks.
+
+A streak is a run of distinct completed-workout dates where consecutive
+dates are at most STREAK_MAX_GAP days apart, i.e. up to 2 rest days in
+between. Runs are stored as TrainingStreak rows; UserTrainingSummary holds
+the latest run and the longest one. Completing a workout after the last
+active date advances the latest run in O(1); any other change recomputes
+only the runs around the affected date.
+"""
+from datetime import timedelta
+
+from django.db import transaction
+
+from workouts.models import Workout
+from .models import TrainingStreak, UserTrainingSummary
+
+STREAK_MAX_GAP = 3
+
+
+def _workout_dates(user_id, **filters):
+    return Workout.objects.filter(
+        user_id=user_id, completed=True, **filters
+    ).values_list('date', flat=True).distinct().order_by('date')
+
+
+def _build_runs(user_id, dates):
+    """Split ascending distinct dates into TrainingStreak rows"""
+    runs = []
+    for day in dates:
+        if runs and (day - runs[-1].end_date).days <= STREAK_MAX_GAP:
+            runs[-1].end_date = day
+            runs[-1].day_count += 1
+        else:
+            runs.append(TrainingStreak(user_id=user_id, start_date=day, end_date=day, day_count=1))
+    return runs
+
+
+def _refresh_summary(summary):
+    """Point the summary at the latest and the longest stored runs"""
+    runs = TrainingStreak.objects.filter(user_id=summary.user_id)
+    latest = runs.order_by('-end_date').first()
+    summary.last_active_date = latest.end_date if latest else None
+    summary.current_streak = latest.day_count if latest else 0
+    summary.longest_streak = runs.order_by('-day_count').values_list(
+        'day_count', flat=True
+    ).first() or 0
+
+
+def _recompute_window(summary, day):
+    """Rebuild the runs that could contain or merge across `day`"""
+    low = day - timedelta(days=STREAK_MAX_GAP)
+    high = day + timedelta(days=STREAK_MAX_GAP)
+    affected = TrainingStreak.objects.filter(
+        user_id=summary.user_id, start_date__lte=high, end_date__gte=low
+    )
+    for run in affected:
+        low = min(low, run.start_date)
+        high = max(high, run.end_date)
+    affected.delete()
+
+    dates = _workout_dates(summary.user_id, date__gte=low, date__lte=high)
+    TrainingStreak.objects.bulk_create(_build_runs(summary.user_id, dates))
+
+
+def _advance(summary, day):
+    """O(1) path for a workout completed after the last active date"""
+    last = summary.last_active_date
+    if last is not None and (day - last).days <= STREAK_MAX_GAP:
+        TrainingStreak.objects.filter(user_id=summary.user_id, end_date=last).update(
+            end_date=day, day_count=summary.current_streak + 1
+        )
+        summary.current_streak += 1
+    else:
+        TrainingStreak.objects.create(user_id=summary.user_id, start_date=day, end_date=day)
+        summary.current_streak = 1
+    summary.last_active_date = day
+    summary.longest_streak = max(summary.longest_streak, summary.current_streak)
+
+
+def update_streaks(user_id, added=None, removed=None):
+    """
+    Apply a change to a user's set of completed workout dates. Must run after
+    the changed workout is saved. Users without a summary row are skipped;
+    theirs is rebuilt on first read.
+    """
+    with transaction.atomic():
+        summary = UserTrainingSummary.objects.select_for_update().filter(user_id=user_id).first()
+        if summary is None:
+            return
+
+        last = summary.last_active_date
+        if removed is None and added is not None:
+            if last is not None and added == last:
+                return
+            if last is None or added > last:
+                _advance(summary, added)
+            else:
+                _recompute_window(summary, added)
+                _refresh_summary(summary)
+        else:
+            for day in {added, removed} - {None}:
+                _recompute_window(summary, day)
+            _refresh_summary(summary)
+
+        summary.save(update_fields=['last_active_date', 'current_streak', 'longest_streak', 'updated_at'])
+
+
+def rebuild_streaks(summary):
+    """Recompute every run for the summary's user from their workout history"""
+    TrainingStreak.objects.filter(user_id=summary.user_id).delete()
+    TrainingStreak.objects.bulk_create(
+        _build_runs(summary.user_id, _workout_dates(summary.user_id).iterator()),
+        batch_size=1000
+    )
+    _refresh_summary(summary)
+    summary.save(update_fields=['last_active_date', 'current_streak', 'longest_streak', 'updated_at'])
+
+
+def displayed_streak(summary, today):
+    """The current streak only counts if the last workout was today or yesterday"""
+    if summary.last_active_date in (today, today - timedelta(days=1)):
+        return summary.current_streak
+    return 0
@@ -1,3 +1,786 @@
-from django.test import TestCase
+from datetime import date, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+import numpy as np
+from rest_framework.test import APITestCase
+
+from workouts.models import Exercise, MuscleGroup, Set, Workout, WorkoutExercise
+from .models import (
+    DailyTrainingLoad,
+    ExerciseDailySummary,
+    ExerciseFrequency,
+    PersonalRecord,
+    PersonalRecordHistory,
+    ProgressSnapshot,
+    TrainingStreak,
+    UserTrainingSummary,
+)
+from . import tracking
+from .cache import get_cache_stats
+from .downsampling import downsample, lttb, record_indices
+from .formulas import best_by_group, one_rep_max
+from .percentiles import build_points, percentile_rank, rebuild_percentile_index
+from .records import recompute_personal_records
+from .training_load import ACUTE_DAYS, CHRONIC_DAYS, acwr_zone
+from .trends import ewma, rolling_mean
+from .rollups import rebuild_user_summaries
+
+User = get_user_model()
+
+
+class AnalyticsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='lifter@example.com', username='lifter', password='password'
+        )
+        self.client.force_authenticate(self.user)
+        self.bench = Exercise.objects.create(name='Bench')
+        self.squat = Exercise.objects.create(name='Squat')
+
+    def log_workout(self, day, sets, completed=True):
+        """
+        Create a workout from {exercise: [(weight, reps[, completed]), ...]},
+        committing like a request
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            workout = Workout.objects.create(user=self.user, date=day, completed=completed)
+            for order, (exercise, exercise_sets) in enumerate(sets.items()):
+                workout_exercise = WorkoutExercise.objects.create(
+                    workout=workout, exercise=exercise, order=order
+                )
+                for number, (weight, reps, *done) in enumerate(exercise_sets, start=1):
+                    Set.objects.create(
+                        workout_exercise=workout_exercise,
+                        set_number=number,
+                        weight=Decimal(weight),
+                        reps=reps,
+                        completed=done[0] if done else True,
+                    )
+        return workout
+
+
+class WorkoutStatsTests(AnalyticsTestCase):
+    def test_first_call_builds_summary_with_most_frequent_exercise(self):
+        self.log_workout(date(2026, 1, 5), {self.bench: [(100, 5)], self.squat: [(140, 5)]})
+        self.log_workout(date(2026, 1, 7), {self.bench: [(100, 5)]})
+        UserTrainingSummary.objects.filter(user=self.user).delete()
+
+        for _ in range(2):
+            response = self.client.get('/api/analytics/workout_stats/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['most_frequent_exercise'], 'Bench')
+            self.assertEqual(response.data['total_workouts'], 2)
+
+    def test_dashboard_stats_build_summary_with_most_frequent_exercise(self):
+        self.log_workout(date(2026, 1, 5), {self.squat: [(140, 5)]})
+        UserTrainingSummary.objects.filter(user=self.user).delete()
+
+        response = self.client.get('/api/analytics/dashboard/', {'include': 'stats'})
+        self.assertEqual(response.data['stats']['most_frequent_exercise'], 'Squat')
+
+
+class DerivedDataTests(AnalyticsTestCase):
+    """Incremental maintenance must leave the same rows as a full rebuild"""
+
+    DERIVED_MODELS = (
+        ExerciseDailySummary,
+        DailyTrainingLoad,
+        UserTrainingSummary,
+        ExerciseFrequency,
+        TrainingStreak,
+        PersonalRecord,
+        PersonalRecordHistory,
+    )
+    IGNORED_FIELDS = {'id', 'created_at', 'updated_at'}
+
+    def setUp(self):
+        super().setUp()
+        self.first = self.log_workout(date(2026, 1, 5), {
+            self.bench: [(100, 5), (105, 3)],
+            self.squat: [(140, 5)],
+        })
+        self.second = self.log_workout(date(2026, 1, 6), {self.bench: [(110, 2), (90, 8)]})
+        self.third = self.log_workout(date(2026, 1, 8), {
+            self.bench: [(95, 5)],
+            self.squat: [(150, 3), (120, 0)],
+        })
+        rebuild_user_summaries(self.user.pk)
+
+    def derived_rows(self):
+        rows = {}
+        for model in self.DERIVED_MODELS:
+            fields = [
+                field.attname for field in model._meta.concrete_fields
+                if field.attname not in self.IGNORED_FIELDS
+            ]
+            rows[model.__name__] = sorted(
+                model.objects.filter(user=self.user).values_list(*fields), key=repr
+            )
+        return rows
+
+    def assertMatchesRebuild(self):
+        incremental = self.derived_rows()
+        rebuild_user_summaries(self.user.pk)
+        recompute_personal_records(self.user.pk, [self.bench.pk, self.squat.pk])
+        self.assertEqual(incremental, self.derived_rows())
+
+    def test_set_edit(self):
+        best = Set.objects.get(workout_exercise__workout=self.second, weight=110)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/sets/{best.pk}/', {'weight': '80'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertMatchesRebuild()
+
+    def test_date_move(self):
+        self.first.date = date(2026, 1, 9)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first.save()
+        self.assertMatchesRebuild()
+
+    def test_uncomplete(self):
+        self.second.completed = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.second.save()
+        self.assertMatchesRebuild()
+
+    def test_workout_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.third.delete()
+        self.assertMatchesRebuild()
+
+    def test_workout_exercise_delete(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            WorkoutExercise.objects.get(workout=self.first, exercise=self.bench).delete()
+        self.assertMatchesRebuild()
+
+
+class VolumeTrendTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        # 2026-01-05 and 2026-01-12 are Mondays
+        self.log_workout(date(2026, 1, 5), {self.bench: [(100, 5)], self.squat: [(140, 5)]})
+        self.log_workout(date(2026, 1, 7), {})
+        self.log_workout(date(2026, 1, 12), {self.bench: [(110, 2)]})
+        self.log_workout(date(2026, 1, 13), {self.bench: [(200, 5)]}, completed=False)
+
+    def get(self, **params):
+        params = {'start_date': '2026-01-01', 'end_date': '2026-01-31', **params}
+        response = self.client.get('/api/analytics/volume_trend/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_weekly_volume_of_completed_workouts(self):
+        data = self.get()
+
+        self.assertEqual(
+            [(item['week_start'], item['volume'], item['workouts']) for item in data],
+            [(date(2026, 1, 5), Decimal('1200'), 2), (date(2026, 1, 12), Decimal('220'), 1)],
+        )
+
+    def test_daily_granularity(self):
+        data = self.get(granularity='day')
+
+        self.assertEqual(
+            [(item['period_start'], item['volume']) for item in data],
+            [
+                (date(2026, 1, 5), Decimal('1200')),
+                (date(2026, 1, 7), 0),
+                (date(2026, 1, 12), Decimal('220')),
+            ],
+        )
+
+    def test_unknown_granularity(self):
+        response = self.client.get('/api/analytics/volume_trend/', {'granularity': 'year'})
+        self.assertEqual(response.status_code, 400)
+
+
+class PersonalRecordDetectionTests(AnalyticsTestCase):
+    def complete(self, workout):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f'/api/workouts/{workout.pk}/complete/')
+        self.assertEqual(response.status_code, 200)
+        return response.data['new_personal_records']
+
+    def records(self):
+        return dict(
+            PersonalRecord.objects.filter(user=self.user, exercise=self.bench)
+            .values_list('record_type', 'value')
+        )
+
+    def test_completion_detects_records(self):
+        workout = self.log_workout(
+            date(2026, 1, 5), {self.bench: [(100, 5), (110, 2)]}, completed=False
+        )
+
+        new_records = self.complete(workout)
+
+        self.assertEqual(len(new_records), 4)
+        self.assertEqual(self.records(), {
+            'max_weight': Decimal('110'),
+            'max_reps': Decimal('5'),
+            'max_volume': Decimal('720'),
+            'one_rep_max': Decimal('117.33'),
+        })
+
+    def test_missed_and_zero_rep_sets_set_no_record(self):
+        workout = self.log_workout(date(2026, 1, 5), {
+            self.bench: [(100, 5), (140, 5, False), (150, 0)],
+        }, completed=False)
+
+        self.complete(workout)
+        self.assertEqual(self.records()['max_weight'], Decimal('100'))
+        self.assertEqual(self.records()['one_rep_max'], Decimal('116.67'))
+
+        recompute_personal_records(self.user.pk, [self.bench.pk])
+        self.assertEqual(self.records()['max_weight'], Decimal('100'))
+        self.assertEqual(self.records()['one_rep_max'], Decimal('116.67'))
+
+    def test_later_workout_only_records_what_it_beats(self):
+        first = self.log_workout(date(2026, 1, 5), {self.bench: [(100, 5)]}, completed=False)
+        self.complete(first)
+
+        new_records = self.complete(
+            self.log_workout(date(2026, 1, 7), {self.bench: [(105, 3)]}, completed=False)
+        )
+
+        self.assertEqual(
+            [record['record_type'] for record in new_records], ['max_weight']
+        )
+        self.assertEqual(
+            PersonalRecordHistory.objects.filter(
+                user=self.user, exercise=self.bench, record_type='max_weight'
+            ).count(),
+            2,
+        )
+
+
+class FormulaTests(SimpleTestCase):
+    def test_estimates(self):
+        weights, reps = [100, 100], [1, 10]
+
+        np.testing.assert_allclose(one_rep_max(weights, reps, 'epley'), [103.333, 133.333], 1e-5)
+        np.testing.assert_allclose(one_rep_max(weights, reps, 'brzycki'), [100, 133.333], 1e-5)
+        np.testing.assert_allclose(one_rep_max(weights, reps, 'lombardi'), [100, 125.893], 1e-5)
+
+    def test_sets_without_reps_are_nan(self):
+        for formula in ('epley', 'brzycki', 'lombardi'):
+            self.assertTrue(np.isnan(one_rep_max([100], [0], formula)).all())
+
+    def test_brzycki_rep_cap(self):
+        estimates = one_rep_max([100, 100, 100], [12, 13, 37], 'brzycki')
+
+        self.assertAlmostEqual(estimates[0], 144)
+        self.assertTrue(np.isnan(estimates[1:]).all())
+
+    def test_best_by_group_ignores_nan(self):
+        keys, best = best_by_group([1, 1, 2, 3], [5, np.nan, np.nan, 7])
+
+        self.assertEqual(keys.tolist(), [1, 2, 3])
+        self.assertEqual(best[0], 5)
+        self.assertTrue(np.isnan(best[1]))
+        self.assertEqual(best[2], 7)
+
+
+class ExerciseProgressTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.log_workout(date(2026, 1, 5), {self.bench: [(100, 5), (300, 36)]})
+        self.log_workout(date(2026, 1, 6), {self.bench: [('9999.99', 10)]})
+
+    def one_rep_maxes(self, formula):
+        response = self.client.get('/api/analytics/exercise_progress/', {
+            'exercise_id': self.bench.pk,
+            'formula': formula,
+            'start_date': '2026-01-01',
+            'end_date': '2026-01-31',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['formula'], formula)
+        return [day['one_rep_max'] for day in response.data['results']]
+
+    def test_epley(self):
+        self.assertEqual(self.one_rep_maxes('epley'), ['660.00', '13333.32'])
+
+    def test_brzycki_skips_high_rep_sets(self):
+        self.assertEqual(self.one_rep_maxes('brzycki'), ['112.50', '13333.32'])
+
+    def test_lombardi(self):
+        self.assertEqual(self.one_rep_maxes('lombardi'), ['429.29', '12589.24'])
+
+    def test_unknown_formula(self):
+        response = self.client.get('/api/analytics/exercise_progress/', {
+            'exercise_id': self.bench.pk, 'formula': 'wathan',
+        })
+        self.assertEqual(response.status_code, 400)
+
+
+class ResponseCacheTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.workout = self.log_workout(date(2026, 1, 5), {self.bench: [(100, 5)]})
+        self.url = '/api/analytics/volume_trend/'
+        self.params = {'start_date': '2026-01-01', 'end_date': '2026-01-31'}
+
+    def volumes(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return [item['volume'] for item in response.data]
+
+    def test_repeated_request_is_a_hit(self):
+        first = self.volumes(self.params)
+        # Parameter order does not matter
+        second = self.volumes(dict(reversed(list(self.params.items()))))
+
+        self.assertEqual(first, second)
+        stats = get_cache_stats()
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_other_parameters_miss(self):
+        self.volumes(self.params)
+        self.volumes({**self.params, 'granularity': 'day'})
+
+        self.assertEqual(get_cache_stats()['misses'], 2)
+
+    def test_write_invalidates(self):
+        self.assertEqual(self.volumes(self.params), [Decimal('500')])
+
+        best = Set.objects.get(workout_exercise__workout=self.workout)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f'/api/sets/{best.pk}/', {'reps': 6}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(self.volumes(self.params), [Decimal('600')])
+        self.assertEqual(get_cache_stats()['hits'], 0)
+
+    def test_cache_stats_is_staff_only(self):
+        url = '/api/analytics/cache_stats/'
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.volumes(self.params)
+        self.assertEqual(self.client.get(url).data['misses'], 1)
+        self.assertEqual(self.client.delete(url).status_code, 204)
+        self.assertEqual(self.client.get(url).data['misses'], 0)
+
+
+class ConditionalGetTests(AnalyticsTestCase):
+    url = '/api/analytics/workout_stats/'
+
+    def setUp(self):
+        super().setUp()
+        self.workout = self.log_workout(date(2026, 1, 5), {self.bench: [(100, 5)]})
+
+    def test_matching_etag_is_not_modified(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertFalse(response.content)
+
+    def test_write_changes_etag(self):
+        etag = self.client.get(self.url)['ETag']
+        best = Set.objects.get(workout_exercise__workout=self.workout)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(f'/api/sets/{best.pk}/', {'reps': 6}, format='json')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.data['total_reps'], 6)
+
+    def test_version_bumped_once_after_all_writes(self):
+        self.client.get(self.url)
+        workout = self.log_workout(date(2026, 1, 7), {self.bench: [(110, 5)]}, completed=False)
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = self.client.post(f'/api/workouts/{workout.pk}/complete/')
+        self.assertEqual(len(response.data['new_personal_records']), 3)
+
+        statements = [query['sql'] for query in queries]
+        bumps = [
+            index for index, sql in enumerate(statements)
+            if sql.startswith('UPDATE "analytics_userdataversion"')
+        ]
+        writes = [
+            index for index, sql in enumerate(statements)
+            if sql.startswith(('INSERT', 'UPDATE')) and index not in bumps
+        ]
+        self.assertEqual(len(bumps), 1)
+        self.assertGreater(bumps[0], max(writes))
+
+
+class DashboardTests(AnalyticsTestCase):
+    """Each dashboard section must match the standalone action it replaces"""
+
+    def setUp(self):
+        super().setUp()
+        chest = MuscleGroup.objects.create(name='Chest')
+        legs = MuscleGroup.objects.create(name='Legs')
+        self.bench.muscle_groups.add(chest)
+        self.squat.muscle_groups.add(legs, chest)
+        today = timezone.now().date()
+        self.log_workout(today, {self.bench: [(100, 5)], self.squat: [(140, 5)]})
+        self.log_workout(today - timedelta(days=3), {self.bench: [(105, 3)]})
+        self.log_workout(today - timedelta(days=20), {self.squat: [(150, 2)]})
+        self.log_workout(today - timedelta(days=45), {self.bench: [(90, 8)]})
+        self.log_workout(today - timedelta(days=1), {self.bench: [(200, 5)]}, completed=False)
+
+    def get(self, action, **params):
+        response = self.client.get(f'/api/analytics/{action}/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_default_sections(self):
+        dashboard = self.get('dashboard')
+
+        self.assertEqual(dashboard['stats'], self.get('workout_stats'))
+        self.assertEqual(dashboard['volume_trend'], self.get('volume_trend'))
+        self.assertEqual(dashboard['muscle_groups'], self.get('frequency_by_muscle_group'))
+        self.assertEqual(
+            [record['id'] for record in dashboard['personal_records']],
+            list(
+                PersonalRecord.objects.filter(user=self.user)
+                .order_by('-date_achieved').values_list('id', flat=True)
+            ),
+        )
+        self.assertIsNone(dashboard['latest_snapshot'])
+
+    def test_parameters(self):
+        start = (timezone.now().date() - timedelta(days=60)).isoformat()
+        for granularity in ('day', 'week', 'month'):
+            dashboard = self.get(
+                'dashboard',
+                include='volume_trend,muscle_groups',
+                granularity=granularity,
+                start_date=start,
+                muscle_group_start_date=start,
+            )
+
+            self.assertEqual(set(dashboard), {'volume_trend', 'muscle_groups'})
+            self.assertEqual(
+                dashboard['volume_trend'],
+                self.get('volume_trend', granularity=granularity, start_date=start),
+            )
+            self.assertEqual(
+                dashboard['muscle_groups'],
+                self.get('frequency_by_muscle_group', start_date=start),
+            )
+
+    def test_unknown_section(self):
+        response = self.client.get('/api/analytics/dashboard/', {'include': 'stats,goals'})
+        self.assertEqual(response.status_code, 400)
+
+
+class DownsamplingTests(SimpleTestCase):
+    def test_short_series_untouched(self):
+        self.assertEqual(lttb(range(5), range(5), 5).tolist(), [0, 1, 2, 3, 4])
+
+    def test_lttb_keeps_ends_and_spikes(self):
+        y = np.zeros(100)
+        y[37], y[71] = 50, -50
+
+        selected = lttb(np.arange(100), y, 10)
+
+        self.assertEqual(len(selected), 10)
+        self.assertEqual(selected.tolist(), sorted(selected.tolist()))
+        self.assertEqual((selected[0], selected[-1]), (0, 99))
+        self.assertIn(37, selected)
+        self.assertIn(71, selected)
+
+    def test_record_indices(self):
+        self.assertEqual(record_indices([5, 3, 5, 6, np.nan, 8, 7]).tolist(), [0, 3, 5])
+        self.assertEqual(record_indices([]).tolist(), [])
+
+    def test_downsample_keeps_records_within_half_the_budget(self):
+        y = np.arange(20, dtype=np.float64)
+
+        selected = downsample(np.arange(20), y, 6, keep=record_indices(y))
+
+        self.assertLessEqual(len(selected), 6)
+        # Every point is a record; the highest three are kept
+        self.assertTrue({17, 18, 19} <= set(selected.tolist()))
+
+
+class ProgressDownsamplingTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.weights = [100, 101, 99, 98, 120, 97, 96, 95, 94, 93, 110, 92]
+        for day, weight in enumerate(self.weights, start=1):
+            self.log_workout(date(2026, 1, day), {self.bench: [(weight, 1)]})
+
+    def get(self, max_points):
+        return self.client.get('/api/analytics/exercise_progress/', {
+            'exercise_id': self.bench.pk,
+            'start_date': '2026-01-01',
+            'end_date': '2026-01-31',
+            'max_points': max_points,
+        })
+
+    def test_keeps_record_days(self):
+        response = self.get(5)
+
+        self.assertEqual(response.status_code, 200)
+        days = [item['date'] for item in response.data['results']]
+        self.assertLessEqual(len(days), 5)
+        self.assertEqual(days, sorted(days))
+        # Every new best survives, and LTTB keeps the last day
+        for day in ('2026-01-01', '2026-01-02', '2026-01-05', '2026-01-12'):
+            self.assertIn(day, days)
+
+    def test_budget_above_length_returns_everything(self):
+        self.assertEqual(len(self.get(50).data['results']), len(self.weights))
+
+    def test_invalid_max_points(self):
+        for value in ('2', 'ten'):
+            self.assertEqual(self.get(value).status_code, 400)
+
+
+class ExercisesProgressTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.deadlift = Exercise.objects.create(name='Deadlift')
+        self.log_workout(date(2026, 1, 5), {self.bench: [(100, 5)], self.squat: [(140, 5)]})
+        self.log_workout(date(2026, 1, 7), {self.bench: [(105, 3), (100, 6)]})
+        self.params = {'start_date': '2026-01-01', 'end_date': '2026-01-31'}
+
+    def get(self, **params):
+        return self.client.get('/api/analytics/exercises_progress/', {**self.params, **params})
+
+    def test_matches_exercise_progress(self):
+        for formula in ('epley', 'brzycki'):
+            ids = f'{self.bench.pk},{self.squat.pk},{self.deadlift.pk}'
+            response = self.get(exercise_ids=ids, formula=formula)
+
+            self.assertEqual(response.status_code, 200)
+            results = response.data['results']
+            self.assertEqual(list(results), [self.bench.pk, self.squat.pk, self.deadlift.pk])
+            for exercise in (self.bench, self.squat, self.deadlift):
+                single = self.client.get('/api/analytics/exercise_progress/', {
+                    **self.params, 'exercise_id': exercise.pk, 'formula': formula,
+                })
+                self.assertEqual(results[exercise.pk], single.data['results'])
+            self.assertEqual(results[self.deadlift.pk], [])
+
+    def test_repeated_parameter_and_duplicates(self):
+        response = self.get(exercise_ids=[self.bench.pk, f'{self.squat.pk},{self.bench.pk}'])
+
+        self.assertEqual(list(response.data['results']), [self.bench.pk, self.squat.pk])
+
+    def test_invalid_ids(self):
+        for ids in ('', '1,x', ','.join(str(pk) for pk in range(1, 22))):
+            self.assertEqual(self.get(exercise_ids=ids).status_code, 400)
+
+
+class PercentileTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.user.weight_unit = 'lb'
+        self.user.save()
+        self.kilos = User.objects.create_user(
+            email='kilos@example.com', username='kilos', password='password', weight_unit='kg'
+        )
+        self.light = User.objects.create_user(
+            email='light@example.com', username='light', password='password', weight_unit='kg'
+        )
+        bests = ((self.user, 220, 10), (self.kilos, 100, 5), (self.light, 50, 12))
+        for user, weight, reps in bests:
+            for record_type, value in (('max_weight', weight), ('max_reps', reps)):
+                PersonalRecord.objects.create(
+                    user=user, exercise=self.bench, record_type=record_type,
+                    value=Decimal(value), date_achieved=date(2026, 1, 5),
+                )
+        rebuild_percentile_index(full=True)
+
+    def percentiles(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/personal-records/percentiles/')
+        self.assertEqual(response.status_code, 200)
+        return {item['record_type']: item['percentile'] for item in response.data}
+
+    def test_weights_compared_in_one_unit(self):
+        # 100 kg is 220.46 lb, just above 220 lb; 50 kg is the lightest
+        self.assertEqual(self.percentiles(self.user)['max_weight'], 33.3)
+        self.assertEqual(self.percentiles(self.kilos)['max_weight'], 66.7)
+        self.assertEqual(self.percentiles(self.light)['max_weight'], 0)
+
+    def test_reps_are_not_converted(self):
+        self.assertEqual(self.percentiles(self.user)['max_reps'], 33.3)
+        self.assertEqual(self.percentiles(self.light)['max_reps'], 66.7)
+
+    def test_unit_change_rebuilds_incrementally(self):
+        self.user.weight_unit = 'kg'
+        self.user.save()
+
+        self.assertEqual(rebuild_percentile_index(), 2)
+        self.assertEqual(self.percentiles(self.user)['max_weight'], 66.7)
+
+    def test_sketch(self):
+        points = build_points(range(10000))
+
+        self.assertEqual(len(points), 1000)
+        self.assertAlmostEqual(percentile_rank(points, 2500), 25, delta=0.1)
+        self.assertIsNone(percentile_rank([], 1))
+
+
+class TrendTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        # Every other day, the last entry two weeks after the first
+        self.weights = [200, 199, 201, 198, 197, 199, 196, 195]
+        for index, weight in enumerate(self.weights):
+            ProgressSnapshot.objects.create(
+                user=self.user, date=date(2026, 1, 1) + timedelta(days=2 * index),
+                body_weight=Decimal(weight),
+            )
+        # Snapshots without the metric are skipped
+        ProgressSnapshot.objects.create(
+            user=self.user, date=date(2026, 1, 2), body_fat_percentage=20
+        )
+
+    def get(self, **params):
+        response = self.client.get('/api/progress-snapshots/trend/', params)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_rolling_means_and_ewma(self):
+        data = self.get(windows='3', span='3')
+
+        results = data['results']
+        self.assertEqual(len(results), len(self.weights))
+        expected = rolling_mean(np.array(self.weights, dtype=np.float64), 3)
+        self.assertEqual(
+            [item['rolling_3'] for item in results], [round(value, 2) for value in expected]
+        )
+        self.assertEqual(results[2]['rolling_3'], 200)
+        smoothed = ewma(np.array(self.weights, dtype=np.float64), 3)
+        self.assertEqual([item['ewma'] for item in results], [round(v, 2) for v in smoothed])
+
+    def test_week_over_week(self):
+        results = self.get()['results']
+
+        # Nothing a week older before the fifth entry (day 8)
+        self.assertEqual([item['week_over_week'] for item in results[:4]], [None] * 4)
+        self.assertEqual(results[4]['week_over_week'], 197 - 200)
+        self.assertEqual(results[7]['week_over_week'], 195 - 198)
+
+    def test_start_date_keeps_earlier_entries_for_smoothing(self):
+        full = self.get(windows='3')['results']
+
+        results = self.get(windows='3', start_date='2026-01-09')['results']
+
+        self.assertEqual(results, full[4:])
+
+    def test_rolling_mean_fallback(self):
+        means = rolling_mean(np.array([1.0, 2.0, 3.0, 6.0]), 2)
+        self.assertEqual(means.tolist(), [1, 1.5, 2.5, 4.5])
+
+    def test_invalid_parameters(self):
+        invalid = ({'metric': 'mood'}, {'windows': '1'}, {'windows': '2,3,4,5,6'}, {'span': '0'})
+        for params in invalid:
+            response = self.client.get('/api/progress-snapshots/trend/', params)
+            self.assertEqual(response.status_code, 400)
+
+
+class TrainingLoadTests(AnalyticsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.loads = {
+            date(2026, 1, 1): 1000,
+            date(2026, 1, 3): 500,
+            date(2026, 1, 8): 700,
+            date(2026, 1, 20): 1200,
+        }
+        for day, load in self.loads.items():
+            self.log_workout(day, {self.bench: [(load / 10, 10)]})
+        self.log_workout(date(2026, 1, 21), {self.bench: [(100, 10)]}, completed=False)
+
+    def get(self, **params):
+        return self.client.get('/api/analytics/training_load/', params)
+
+    def expected(self, day):
+        """The day's metrics computed the slow way"""
+        def window(days):
+            return [self.loads.get(day - timedelta(days=offset), 0) for offset in range(days)]
+
+        acute, chronic = window(ACUTE_DAYS), window(CHRONIC_DAYS)
+        acute_mean = np.mean(acute)
+        deviation = np.std(acute)
+        monotony = acute_mean / deviation if deviation else None
+        return {
+            'load': self.loads.get(day, 0),
+            'acute_load': round(acute_mean, 2),
+            'chronic_load': round(np.mean(chronic), 2),
+            'acwr': round(acute_mean / np.mean(chronic), 2) if any(chronic) else None,
+            'monotony': round(monotony, 2) if monotony else None,
+            'strain': round(sum(acute) * monotony, 2) if monotony else None,
+        }
+
+    def test_matches_direct_computation(self):
+        response = self.get(start_date='2026-01-05', end_date='2026-01-31')
+
+        self.assertEqual(response.status_code, 200)
+        results = response.data['results']
+        self.assertEqual(len(results), 27)
+        for item in results:
+            expected = self.expected(item['date'])
+            self.assertEqual({name: item[name] for name in expected}, expected, item['date'])
+            self.assertEqual(item['zone'], acwr_zone(item['acwr']))
+
+    def test_follows_deleted_workouts(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Workout.objects.filter(date=date(2026, 1, 20)).delete()
+        del self.loads[date(2026, 1, 20)]
+
+        item = self.get(start_date='2026-01-20', end_date='2026-01-20').data['results'][0]
+
+        self.assertEqual(item['load'], 0)
+        self.assertEqual(item['chronic_load'], self.expected(date(2026, 1, 20))['chronic_load'])
+
+    def test_zones(self):
+        zones = [acwr_zone(ratio) for ratio in (None, 0.5, 1.0, 1.4, 2.0)]
+        self.assertEqual(zones, [None, 'low', 'optimal', 'elevated', 'high'])
+
+    def test_invalid_ranges(self):
+        for params in (
+            {'start_date': '2026-02-01', 'end_date': '2026-01-01'},
+            {'start_date': '2020-01-01', 'end_date': '2026-01-01'},
+            {'start_date': 'yesterday'},
+        ):
+            self.assertEqual(self.get(**params).status_code, 400)
+
+
+class TrackingTests(TransactionTestCase):
+    """Needs real transactions: the rollback under test is of the outermost one"""
+
+    def test_rollback_discards_resolved_workout_exercises(self):
+        user = User.objects.create_user(
+            email='lifter@example.com', username='lifter', password='password'
+        )
+        bench = Exercise.objects.create(name='Bench')
+        workout = Workout.objects.create(user=user, date=date(2026, 1, 5), completed=True)
+        workout_exercise = WorkoutExercise.objects.create(workout=workout, exercise=bench, order=0)
+
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                tracking.remember_workout_exercises([
+                    (workout_exercise.pk, user.pk, bench.pk, date(2000, 1, 1), True)
+                ])
+                raise RuntimeError
+
+        self.assertEqual(
+            tracking.resolve_workout_exercise(workout_exercise.pk),
+            (user.pk, bench.pk, date(2026, 1, 5), True),
+        )
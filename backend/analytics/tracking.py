@@ -0,0 +1,165 @@
+"""
+Tracking of workout writes that invalidate derived analytics data.
+
+Signal handlers (and bulk write paths that bypass signals) mark the
+(user_id, exercise_id, date) keys they touch. Keys are collected per thread
+and refreshed once when the surrounding transaction commits, so deleting a
+workout with fifty sets refreshes each affected day once, not fifty times.
+
+Edits that can lower or move an existing best also mark (user_id,
+exercise_id) pairs whose personal records are recomputed on the same flush.
+Every user whose data changed gets their data version bumped last.
+
+Nothing runs when the transaction rolls back instead, so pending state is
+only trusted while a flush is still registered with the current
+transaction. Anything left over from a rolled-back one is discarded before
+it can be read, or a later edit could be resolved to a stale date.
+"""
+import threading
+from collections import defaultdict
+
+from django.db import connection, transaction
+
+from workouts.models import WorkoutExercise
+from .cache import bump_data_version
+from .records import recompute_personal_records
+from .rollups import refresh_exercise_days
+
+_state = threading.local()
+
+
+def _reset():
+    _state.keys = set()
+    _state.records = set()
+    _state.users = set()
+    # workout_exercise_id -> (user_id, exercise_id, date, completed)
+    _state.resolved = {}
+
+
+def _flush_registered():
+    return any(callback is flush for _, callback, _ in connection.run_on_commit)
+
+
+def _pending():
+    if not hasattr(_state, 'keys'):
+        _reset()
+    elif (
+        _state.keys or _state.records or _state.users or _state.resolved
+    ) and not _flush_registered():
+        # Left behind by a transaction that rolled back
+        _reset()
+    return _state
+
+
+def remember_workout_exercises(rows):
+    """
+    Cache (id, user_id, exercise_id, date, completed) tuples until the current
+    transaction commits, so a cascading delete can resolve its sets without
+    one query per set.
+    """
+    resolved = _pending().resolved
+    for we_id, user_id, exercise_id, day, completed in rows:
+        resolved[we_id] = (user_id, exercise_id, day, completed)
+    transaction.on_commit(flush)
+
+
+def workout_exercise_rows(**filters):
+    """Query (id, user_id, exercise_id, date, completed) tuples for workout exercises"""
+    return WorkoutExercise.objects.filter(**filters).values_list(
+        'id', 'workout__user_id', 'exercise_id', 'workout__date', 'workout__completed'
+    )
+
+
+def resolve_workout_exercise(workout_exercise_id):
+    """Return (user_id, exercise_id, date, completed) for a workout exercise"""
+    resolved = _pending().resolved
+    if workout_exercise_id in resolved:
+        return resolved[workout_exercise_id]
+    row = workout_exercise_rows(pk=workout_exercise_id).first()
+    return row[1:] if row else None
+
+
+def mark_dirty(keys):
+    """Schedule (user_id, exercise_id, date) keys for refresh on commit"""
+    keys = set(keys)
+    if not keys:
+        return
+    _pending().keys.update(keys)
+    # Registered on every call: a callback discarded with a rolled-back
+    # savepoint must not strand keys marked earlier in the transaction.
+    transaction.on_commit(flush)
+
+
+def mark_records_dirty(pairs):
+    """Schedule (user_id, exercise_id) personal records for recompute on commit"""
+    pairs = set(pairs)
+    if not pairs:
+        return
+    _pending().records.update(pairs)
+    transaction.on_commit(flush)
+
+
+def mark_user_changed(user_id):
+    """Schedule a data version bump for a user on commit"""
+    _pending().users.add(user_id)
+    transaction.on_commit(flush)
+
+
+def mark_workout_exercise(workout_exercise_id):
+    """
+    Mark the owner of a workout exercise as changed, and its day and records
+    dirty if its workout is completed
+    """
+    resolved = resolve_workout_exercise(workout_exercise_id)
+    if resolved:
+        mark_user_changed(resolved[0])
+    if resolved and resolved[3]:
+        mark_dirty([resolved[:3]])
+        mark_records_dirty([resolved[:2]])
+
+
+def flush():
+    """Refresh everything pending. Safe to call when nothing is pending."""
+    # Commit hooks are unregistered while they run, so skip the staleness check
+    if not hasattr(_state, 'keys'):
+        _reset()
+    state = _state
+    keys, state.keys = state.keys, set()
+    records, state.records = state.records, set()
+    users, state.users = state.users, set()
+    state.resolved = {}
+    if keys:
+        refresh_exercise_days(keys)
+
+    exercises_by_user = defaultdict(set)
+    for user_id, exercise_id in records:
+        exercises_by_user[user_id].add(exercise_id)
+    for user_id, exercise_ids in exercises_by_user.items():
+        recompute_personal_records(user_id, exercise_ids)
+
+    # Bumped only once derived data is current, so nothing computed from the
+    # old rows can be cached or tagged with the new version
+    users |= {key[0] for key in keys} | set(exercises_by_user)
+    if users:
+        bump_data_version(users)
+
+
+class AtomicWriteMixin:
+    """
+    ViewSet mixin running create, update and destroy in one transaction, so
+    a request flushes once, after all of its writes. Without it every save
+    commits and flushes on its own, and the data version can be bumped
+    before the rest of the request has written its rows.
+    """
+
+    def create(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().create(request, *args, **kwargs)
+
+    def update(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().update(request, *args, **kwargs)
+
+    def destroy(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().destroy(request, *args, **kwargs)
@@ -0,0 +1,96 @@
+"""
+Rolling training-load metrics from the DailyTrainingLoad table.
+
+Daily load is the volume lifted (weight x reps). Days without a completed
+workout count as zero load. For each day:
+
+- acute load: mean daily load over the last ACUTE_DAYS days
+- chronic load: mean daily load over the last CHRONIC_DAYS days
+- acute:chronic workload ratio (ACWR): acute / chronic
+- monotony: mean / standard deviation of daily load over the acute window
+- strain: total acute-window load x monotony
+
+Every window is a difference of cumulative sums over one dense array, so a
+year of days costs a single indexed range query plus O(days) arithmetic.
+"""
+from datetime import timedelta
+
+import numpy as np
+
+from .models import DailyTrainingLoad
+
+ACUTE_DAYS = 7
+CHRONIC_DAYS = 28
+
+# Upper bounds of the ACWR zones; above the last one is 'high'
+ACWR_ZONES = (
+    (0.8, 'low'),
+    (1.3, 'optimal'),
+    (1.5, 'elevated'),
+)
+
+
+def acwr_zone(ratio):
+    if ratio is None:
+        return None
+    for upper, zone in ACWR_ZONES:
+        if ratio < upper:
+            return zone
+    return 'high'
+
+
+def window_sums(values, window):
+    """Sum of each value and the window - 1 values before it"""
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    return sums[window:] - sums[:-window]
+
+
+def training_load(user, start_date, end_date):
+    """
+    One item per day from start_date to end_date with the day's load and
+    its rolling metrics. Loads from before start_date fill the windows.
+    """
+    days = (end_date - start_date).days + 1
+    if days <= 0:
+        return []
+    # Enough history for the longest window of the first day
+    history = CHRONIC_DAYS - 1
+    first_day = start_date - timedelta(days=history)
+
+    loads = np.zeros(days + history)
+    for day, volume in DailyTrainingLoad.objects.filter(
+        user=user, date__gte=first_day, date__lte=end_date
+    ).values_list('date', 'total_volume'):
+        loads[(day - first_day).days] = float(volume)
+
+    acute_sums = window_sums(loads, ACUTE_DAYS)[history - ACUTE_DAYS + 1:]
+    chronic_sums = window_sums(loads, CHRONIC_DAYS)
+    acute_squares = window_sums(loads ** 2, ACUTE_DAYS)[history - ACUTE_DAYS + 1:]
+
+    acute = acute_sums / ACUTE_DAYS
+    chronic = chronic_sums / CHRONIC_DAYS
+    # Population standard deviation; clipped at zero against rounding error
+    deviation = np.sqrt(np.maximum(acute_squares / ACUTE_DAYS - acute ** 2, 0))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(chronic > 0, acute / chronic, np.nan)
+        monotony = np.where(deviation > 1e-9, acute / deviation, np.nan)
+    strain = acute_sums * monotony
+
+    def rounded(number):
+        return None if np.isnan(number) else round(float(number), 2)
+
+    result = []
+    for index in range(days):
+        item_ratio = rounded(ratio[index])
+        result.append({
+            'date': start_date + timedelta(days=index),
+            'load': rounded(loads[history + index]),
+            'acute_load': rounded(acute[index]),
+            'chronic_load': rounded(chronic[index]),
+            'acwr': item_ratio,
+            'zone': acwr_zone(item_ratio),
+            'monotony': rounded(monotony[index]),
+            'strain': rounded(strain[index]),
+        })
+    return result
@@ -0,0 +1,114 @@
+"""
+Smoothed series of ProgressSnapshot body metrics.
+
+Rolling means over the last N entries come from a single query using
+window functions. Databases without them (SQLite before 3.25) get the same
+means from a NumPy cumulative sum over the raw values. Exponentially
+weighted averages are recursive and week-over-week deltas are keyed on
+calendar dates, neither of which portable window frames can express, so
+both are computed with NumPy over the values the query returns.
+"""
+import numpy as np
+from django.db import connection
+from django.db.models import Avg, F, FloatField, RowRange, Window
+from django.db.models.functions import Cast
+
+from .models import ProgressSnapshot
+
+TREND_METRICS = (
+    'body_weight',
+    'body_fat_percentage',
+    'neck',
+    'chest',
+    'waist',
+    'hips',
+    'biceps',
+    'thighs',
+    'calves',
+)
+
+
+def rolling_mean(values, window):
+    """Mean of each value and up to window - 1 values before it"""
+    sums = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    starts = np.maximum(0, ends - window)
+    return (sums[ends] - sums[starts]) / (ends - starts)
+
+
+def ewma(values, span):
+    """Exponentially weighted mean with alpha = 2 / (span + 1), bias-adjusted"""
+    decay = 1 - 2 / (span + 1)
+    result = np.empty(len(values))
+    numerator = denominator = 0.0
+    for index, value in enumerate(values):
+        numerator = value + decay * numerator
+        denominator = 1 + decay * denominator
+        result[index] = numerator / denominator
+    return result
+
+
+def week_over_week(days, values):
+    """
+    Change from the latest entry at least seven days older, NaN when there
+    is none
+    """
+    previous = np.searchsorted(days, days - np.timedelta64(7, 'D'), side='right') - 1
+    return np.where(previous >= 0, values - values[np.maximum(previous, 0)], np.nan)
+
+
+def snapshot_trend(user, metric, windows, span, start_date=None, end_date=None):
+    """
+    One item per snapshot recording metric, with the value, a rolling mean
+    per window, the EWMA and the week-over-week delta. Smoothing uses
+    entries before start_date so the first items are not truncated.
+    """
+    queryset = ProgressSnapshot.objects.filter(user=user, **{f'{metric}__isnull': False})
+    if end_date:
+        queryset = queryset.filter(date__lte=end_date)
+    queryset = queryset.order_by('date')
+    value = Cast(metric, FloatField())
+
+    if connection.features.supports_over_clause:
+        annotations = {
+            f'rolling_{window}': Window(
+                Avg(value),
+                order_by=F('date').asc(),
+                frame=RowRange(start=-(window - 1), end=0),
+            )
+            for window in windows
+        }
+        rows = list(queryset.annotate(value=value, **annotations).values(
+            'date', 'value', *annotations
+        ))
+        values = np.array([row['value'] for row in rows], dtype=np.float64)
+        rolling = {
+            window: np.array([row[f'rolling_{window}'] for row in rows], dtype=np.float64)
+            for window in windows
+        }
+    else:
+        rows = list(queryset.annotate(value=value).values('date', 'value'))
+        values = np.array([row['value'] for row in rows], dtype=np.float64)
+        rolling = {window: rolling_mean(values, window) for window in windows}
+
+    if not rows:
+        return []
+
+    days = np.array([row['date'] for row in rows], dtype='datetime64[D]')
+    smoothed = ewma(values, span)
+    deltas = week_over_week(days, values)
+
+    def rounded(number):
+        return None if np.isnan(number) else round(float(number), 2)
+
+    result = []
+    for index, row in enumerate(rows):
+        if start_date and row['date'] < start_date:
+            continue
+        item = {'date': row['date'], 'value': rounded(values[index])}
+        for window in windows:
+            item[f'rolling_{window}'] = rounded(rolling[window][index])
+        item['ewma'] = rounded(smoothed[index])
+        item['week_over_week'] = rounded(deltas[index])
+        result.append(item)
+    return result
@@ -1,25 +1,53 @@
 from rest_framework import viewsets, status, filters
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticated
-from django.db.models import Sum, Max, Count, Avg, Q, F
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.settings import api_settings
+from django.db.models import Sum, Max, Count, Avg, Q, F, FloatField
+from django.db.models.functions import Cast, TruncDay, TruncWeek, TruncMonth
 from django.utils import timezone
-from datetime import datetime, timedelta
+from collections import defaultdict
+from datetime import date, datetime, timedelta
 from decimal import Decimal
-
-from .models import PersonalRecord, ProgressSnapshot
+import math
+
+import numpy as np
+
+from .models import (
+    PersonalRecord,
+    PersonalRecordHistory,
+    ProgressSnapshot,
+    ExerciseDailySummary,
+    UserTrainingSummary,
+    ExerciseFrequency,
+    StrengthPercentileIndex,
+)
+from .cache import cached_action, get_cache_stats, reset_cache_stats
+from .catalog import get_muscle_group_map
+from .concurrency import run_queries
+from .conditional import ConditionalGetMixin
+from .downsampling import MIN_POINTS, downsample, record_indices
+from .formulas import ONE_REP_MAX_FORMULAS, best_by_group, one_rep_max
+from .percentiles import percentile_rank, to_index_unit
+from .rollups import rebuild_training_summary
+from .streaks import displayed_streak
+from .training_load import ACUTE_DAYS, CHRONIC_DAYS, training_load
+from .trends import TREND_METRICS, snapshot_trend
 from .serializers import (
     PersonalRecordSerializer,
     PersonalRecordListSerializer,
+    PersonalRecordHistorySerializer,
     ProgressSnapshotSerializer,
     ProgressSnapshotListSerializer,
     ExerciseProgressSerializer,
     WorkoutStatsSerializer,
+    RecordPercentileSerializer,
 )
 from workouts.models import Workout, WorkoutExercise, Set
+from woodshop_api.pagination import KeysetPagination
 
 
-class PersonalRecordViewSet(viewsets.ModelViewSet):
+class PersonalRecordViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing personal records
     """
@@ -28,6 +56,9 @@ class PersonalRecordViewSet(viewsets.ModelViewSet):
     search_fields = ['exercise__name', 'record_type']
     ordering_fields = ['date_achieved', 'value']
     ordering = ['-date_achieved']
+    pagination_class = KeysetPagination
+    # Percentiles change when the index is rebuilt, not with the user's data
+    etag_exempt_actions = ('percentiles',)
 
     def get_queryset(self):
         """Return only user's personal records"""
@@ -73,6 +104,66 @@ class PersonalRecordViewSet(viewsets.ModelViewSet):
         serializer = PersonalRecordListSerializer(records, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=['get'])
+    def history(self, request):
+        """
+        Get the progression of detected personal records, newest first
+        Optional filters: exercise, record_type
+        """
+        queryset = PersonalRecordHistory.objects.filter(user=request.user).select_related('exercise')
+
+        exercise_id = request.query_params.get('exercise')
+        if exercise_id:
+            queryset = queryset.filter(exercise_id=exercise_id)
+
+        record_type = request.query_params.get('record_type')
+        if record_type:
+            queryset = queryset.filter(record_type=record_type)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            serializer = PersonalRecordHistorySerializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = PersonalRecordHistorySerializer(queryset, many=True)
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def percentiles(self, request):
+        """
+        Rank the user's personal records against everyone's, using the
+        precomputed percentile index
+        Optional filters: exercise, record_type
+        """
+        records = list(self.get_queryset())
+        indexes = {
+            (index.exercise_id, index.record_type): index
+            for index in StrengthPercentileIndex.objects.filter(
+                exercise_id__in={record.exercise_id for record in records}
+            )
+        }
+
+        result = []
+        for record in records:
+            index = indexes.get((record.exercise_id, record.record_type))
+            if index is None or not index.points:
+                continue
+            percentile = percentile_rank(index.points, to_index_unit(
+                record.value, record.record_type, request.user.weight_unit
+            ))
+            result.append({
+                'exercise': record.exercise_id,
+                'exercise_name': record.exercise.name,
+                'record_type': record.record_type,
+                'value': record.value,
+                'percentile': percentile,
+                'top_percent': round(100 - percentile, 1),
+                'user_count': index.user_count,
+                'built_at': index.built_at,
+            })
+
+        serializer = RecordPercentileSerializer(result, many=True)
+        return Response(serializer.data)
+
 
 class ProgressSnapshotViewSet(viewsets.ModelViewSet):
     """
@@ -120,18 +211,112 @@ class ProgressSnapshotViewSet(viewsets.ModelViewSet):
             status=status.HTTP_404_NOT_FOUND
         )
 
+    @action(detail=False, methods=['get'])
+    def trend(self, request):
+        """
+        Smoothed series of one body metric
+        Returns: metric, windows, span, results (date, value, rolling_<N> per
+        window, ewma, week_over_week)
+        Query params: metric (default body_weight), windows=7,30 (entries per
+        rolling mean), span=7 (entries, for the weighted average), start_date, end_date
+        """
+        metric = request.query_params.get('metric', 'body_weight')
+        if metric not in TREND_METRICS:
+            return Response(
+                {'error': f"metric must be one of: {', '.join(TREND_METRICS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        windows = request.query_params.get('windows', '7,30').split(',')
+        if (
+            not all(window.strip().isdigit() for window in windows)
+            or len(windows) > 4
+            or not all(2 <= int(window) <= 365 for window in windows)
+        ):
+            return Response(
+                {'error': 'windows must be up to 4 comma separated integers between 2 and 365'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        windows = sorted({int(window) for window in windows})
+
+        span = request.query_params.get('span', '7')
+        if not span.isdigit() or int(span) < 1:
+            return Response(
+                {'error': 'span must be a positive integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        span = int(span)
+
+        start_date = request.query_params.get('start_date')
+        end_date = request.query_params.get('end_date')
+        try:
+            if start_date:
+                start_date = datetime.strptime(start_date, '%Y-%m-%d').date()
+            if end_date:
+                end_date = datetime.strptime(end_date, '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'start_date and end_date must be dates formatted YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-class AnalyticsViewSet(viewsets.ViewSet):
+        results = snapshot_trend(request.user, metric, windows, span, start_date, end_date)
+        return Response({'metric': metric, 'windows': windows, 'span': span, 'results': results})
+
+
+class AnalyticsViewSet(ConditionalGetMixin, viewsets.ViewSet):
     """
     ViewSet for analytics calculations and aggregations
     """
     permission_classes = [IsAuthenticated]
+    # Reports process-wide cache counters, not user data
+    etag_exempt_actions = ('cache_stats',)
+
+    VOLUME_TREND_GRANULARITIES = {
+        'day': TruncDay,
+        'week': TruncWeek,
+        'month': TruncMonth,
+    }
+
+    # Rollup column summed per exercise for each weighting
+    MUSCLE_GROUP_WEIGHTINGS = {
+        'entries': 'session_count',
+        'sets': 'set_count',
+        'volume': 'total_volume',
+    }
+
+    # Upper bound for exercises_progress
+    MAX_PROGRESS_EXERCISES = 20
+
+    # Python equivalents of the truncations above, for the dashboard
+    DASHBOARD_TRUNCATIONS = {
+        'day': lambda day: day,
+        'week': lambda day: day - timedelta(days=day.weekday()),
+        'month': lambda day: day.replace(day=1),
+    }
+
+    DASHBOARD_SECTIONS = (
+        'stats',
+        'volume_trend',
+        'muscle_groups',
+        'personal_records',
+        'latest_snapshot',
+    )
+
+    # Same as the first page of the personal records list
+    DASHBOARD_RECORD_LIMIT = api_settings.PAGE_SIZE
+
+    # Longest range training_load returns, in days
+    MAX_TRAINING_LOAD_DAYS = 3 * 366
 
     @action(detail=False, methods=['get'])
+    @cached_action
     def exercise_progress(self, request):
         """
         Get progress data for a specific exercise over time
-        Returns: date, max_weight, total_reps, total_volume
+        Returns: formula, results (date, max_weight, total_reps, total_volume, one_rep_max)
+        Query params: formula=epley|brzycki|lombardi for the estimated 1RM (default epley),
+        max_points=N to downsample long ranges (personal record days are kept)
         """
         exercise_id = request.query_params.get('exercise_id')
         if not exercise_id:
@@ -139,132 +324,109 @@ class AnalyticsViewSet(viewsets.ViewSet):
                 {'error': 'exercise_id parameter is required'},
                 status=status.HTTP_400_BAD_REQUEST
             )
+        if not exercise_id.isdigit():
+            return Response(
+                {'error': 'exercise_id must be an integer'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Get date range (default to last 90 days)
-        end_date = timezone.now().date()
-        start_date = end_date - timedelta(days=90)
+        options, error = self._progress_options(request)
+        if error:
+            return error
 
-        start_param = request.query_params.get('start_date')
-        end_param = request.query_params.get('end_date')
+        series = self._progress_by_exercise(request.user, [int(exercise_id)], **options)
+        serializer = ExerciseProgressSerializer(series[int(exercise_id)], many=True)
+        return Response({'formula': options['formula'], 'results': serializer.data})
 
-        if start_param:
-            start_date = datetime.strptime(start_param, '%Y-%m-%d').date()
-        if end_param:
-            end_date = datetime.strptime(end_param, '%Y-%m-%d').date()
-
-        # Get workout exercises for this exercise
-        workout_exercises = WorkoutExercise.objects.filter(
-            workout__user=request.user,
-            workout__date__gte=start_date,
-            workout__date__lte=end_date,
-            exercise_id=exercise_id,
-            workout__completed=True
-        ).select_related('workout').prefetch_related('sets')
-
-        # Aggregate by date
-        progress_data = {}
-        for we in workout_exercises:
-            workout_date = we.workout.date
-            sets = we.sets.all()
-
-            if not sets:
-                continue
+    @action(detail=False, methods=['get'])
+    @cached_action
+    def exercises_progress(self, request):
+        """
+        Get progress data for several exercises at once
+        Returns: formula, results keyed by exercise id, each as in exercise_progress
+        Query params: exercise_ids=1,2,3 (or repeated), plus those of exercise_progress
+        """
+        raw_ids = [
+            value.strip()
+            for param in request.query_params.getlist('exercise_ids')
+            for value in param.split(',')
+            if value.strip()
+        ]
+        if not raw_ids or not all(value.isdigit() for value in raw_ids):
+            return Response(
+                {'error': 'exercise_ids must be a comma separated list of exercise ids'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        exercise_ids = list(dict.fromkeys(int(value) for value in raw_ids))
+        if len(exercise_ids) > self.MAX_PROGRESS_EXERCISES:
+            return Response(
+                {'error': f'At most {self.MAX_PROGRESS_EXERCISES} exercises can be requested at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-            max_weight = max([s.weight for s in sets])
-            total_reps = sum([s.reps for s in sets])
-            total_volume = sum([s.weight * s.reps for s in sets])
+        options, error = self._progress_options(request)
+        if error:
+            return error
 
-            if workout_date in progress_data:
-                progress_data[workout_date]['max_weight'] = max(
-                    progress_data[workout_date]['max_weight'], max_weight
-                )
-                progress_data[workout_date]['total_reps'] += total_reps
-                progress_data[workout_date]['total_volume'] += total_volume
-            else:
-                progress_data[workout_date] = {
-                    'date': workout_date,
-                    'max_weight': max_weight,
-                    'total_reps': total_reps,
-                    'total_volume': total_volume,
-                }
-
-        # Convert to list and sort by date
-        result = sorted(progress_data.values(), key=lambda x: x['date'])
-        serializer = ExerciseProgressSerializer(result, many=True)
-        return Response(serializer.data)
+        series = self._progress_by_exercise(request.user, exercise_ids, **options)
+        results = {
+            exercise_id: ExerciseProgressSerializer(days, many=True).data
+            for exercise_id, days in series.items()
+        }
+        return Response({'formula': options['formula'], 'results': results})
 
     @action(detail=False, methods=['get'])
+    @cached_action
     def workout_stats(self, request):
         """
         Get overall workout statistics for the user
         """
         user = request.user
         today = timezone.now().date()
-        week_start = today - timedelta(days=today.weekday())
-        month_start = today.replace(day=1)
-
-        # Total workouts
-        total_workouts = Workout.objects.filter(
-            user=user, completed=True
-        ).count()
-
-        # Workouts this week
-        workouts_this_week = Workout.objects.filter(
-            user=user, completed=True, date__gte=week_start
-        ).count()
-
-        # Workouts this month
-        workouts_this_month = Workout.objects.filter(
-            user=user, completed=True, date__gte=month_start
-        ).count()
-
-        # Total volume (all time)
-        total_volume = Set.objects.filter(
-            workout_exercise__workout__user=user,
-            workout_exercise__workout__completed=True
-        ).aggregate(
-            volume=Sum(F('weight') * F('reps'))
-        )['volume'] or 0
-
-        # Total sets and reps
-        set_stats = Set.objects.filter(
-            workout_exercise__workout__user=user,
-            workout_exercise__workout__completed=True
-        ).aggregate(
-            total_sets=Count('id'),
-            total_reps=Sum('reps')
+        week_start, month_start = self._stats_window(today)
+
+        # Recent counts come from one range query on the (user, date) index.
+        # It and the lifetime lookups are independent and run concurrently.
+        recent, summary, most_frequent = run_queries(
+            lambda: Workout.objects.filter(
+                user=user, completed=True, date__gte=min(week_start, month_start)
+            ).aggregate(
+                this_week=Count('id', filter=Q(date__gte=week_start)),
+                this_month=Count('id', filter=Q(date__gte=month_start)),
+            ),
+            *self._lifetime_stats_queries(user),
         )
 
-        # Most frequent exercise
-        most_frequent = WorkoutExercise.objects.filter(
-            workout__user=user,
-            workout__completed=True
-        ).values('exercise__name').annotate(
-            count=Count('id')
-        ).order_by('-count').first()
-
-        # Current streak (consecutive days with workouts)
-        current_streak = self._calculate_streak(user)
-
-        data = {
-            'total_workouts': total_workouts,
-            'workouts_this_week': workouts_this_week,
-            'workouts_this_month': workouts_this_month,
-            'total_volume': total_volume,
-            'total_sets': set_stats['total_sets'] or 0,
-            'total_reps': set_stats['total_reps'] or 0,
-            'most_frequent_exercise': most_frequent['exercise__name'] if most_frequent else None,
-            'current_streak': current_streak,
-        }
-
-        serializer = WorkoutStatsSerializer(data)
+        serializer = WorkoutStatsSerializer(self._workout_stats_data(
+            user, today, recent['this_week'], recent['this_month'], summary, most_frequent
+        ))
         return Response(serializer.data)
 
     @action(detail=False, methods=['get'])
+    @cached_action
     def volume_trend(self, request):
         """
-        Get volume trend over time (weekly aggregation)
+        Get volume trend over time
+        Query params: granularity=day|week|month (default week),
+        max_points=N to downsample long ranges
         """
+        granularity = request.query_params.get('granularity', 'week')
+        trunc = self.VOLUME_TREND_GRANULARITIES.get(granularity)
+        if trunc is None:
+            return Response(
+                {'error': 'granularity must be one of: day, week, month'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_points = request.query_params.get('max_points')
+        if max_points is not None:
+            if not max_points.isdigit() or int(max_points) < MIN_POINTS:
+                return Response(
+                    {'error': f'max_points must be an integer of at least {MIN_POINTS}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            max_points = int(max_points)
+
         # Get date range (default to last 12 weeks)
         end_date = timezone.now().date()
         start_date = end_date - timedelta(weeks=12)
@@ -272,49 +434,54 @@ class AnalyticsViewSet(viewsets.ViewSet):
         start_param = request.query_params.get('start_date')
         end_param = request.query_params.get('end_date')
 
-        if start_param:
-            start_date = datetime.strptime(start_param, '%Y-%m-%d').date()
-        if end_param:
-            end_date = datetime.strptime(end_param, '%Y-%m-%d').date()
+        try:
+            if start_param:
+                start_date = datetime.strptime(start_param, '%Y-%m-%d').date()
+            if end_param:
+                end_date = datetime.strptime(end_param, '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'start_date and end_date must be dates formatted YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Get all workouts in range
-        workouts = Workout.objects.filter(
+        # One grouped query; workouts without sets still count towards 'workouts'
+        periods = Workout.objects.filter(
             user=request.user,
             completed=True,
             date__gte=start_date,
             date__lte=end_date
-        ).prefetch_related('workout_exercises__sets')
-
-        # Aggregate by week
-        weekly_data = {}
-        for workout in workouts:
-            # Get start of week for this workout
-            week_start = workout.date - timedelta(days=workout.date.weekday())
-
-            # Calculate volume for this workout
-            volume = 0
-            for we in workout.workout_exercises.all():
-                for s in we.sets.all():
-                    volume += s.weight * s.reps
-
-            if week_start in weekly_data:
-                weekly_data[week_start]['volume'] += volume
-                weekly_data[week_start]['workouts'] += 1
-            else:
-                weekly_data[week_start] = {
-                    'week_start': week_start,
-                    'volume': volume,
-                    'workouts': 1
-                }
-
-        # Convert to list and sort
-        result = sorted(weekly_data.values(), key=lambda x: x['week_start'])
+        ).annotate(
+            period_start=trunc('date')
+        ).values('period_start').annotate(
+            volume=Sum(F('exercises__sets__weight') * F('exercises__sets__reps')),
+            workouts=Count('id', distinct=True)
+        ).order_by('period_start')
+
+        periods = list(periods)
+        if max_points and len(periods) > max_points:
+            keep = downsample(
+                self._day_numbers(period['period_start'] for period in periods),
+                [float(period['volume'] or 0) for period in periods],
+                max_points,
+            )
+            periods = [periods[index] for index in keep]
+
+        result = [
+            self._volume_trend_item(
+                granularity, period['period_start'], period['volume'], period['workouts']
+            )
+            for period in periods
+        ]
         return Response(result)
 
     @action(detail=False, methods=['get'])
+    @cached_action
     def frequency_by_muscle_group(self, request):
         """
         Get workout frequency by muscle group
+        Query params: start_date, weighting=entries|sets|volume (default
+        entries, the number of times an exercise was logged)
         """
         # Get date range (default to last 30 days)
         end_date = timezone.now().date()
@@ -322,63 +489,415 @@ class AnalyticsViewSet(viewsets.ViewSet):
 
         start_param = request.query_params.get('start_date')
         if start_param:
-            start_date = datetime.strptime(start_param, '%Y-%m-%d').date()
-
-        # Get workout exercises in date range
-        muscle_group_counts = WorkoutExercise.objects.filter(
-            workout__user=request.user,
-            workout__completed=True,
-            workout__date__gte=start_date,
-            workout__date__lte=end_date
-        ).values(
-            'exercise__muscle_groups__name'
-        ).annotate(
-            count=Count('id')
-        ).order_by('-count')
+            try:
+                start_date = datetime.strptime(start_param, '%Y-%m-%d').date()
+            except ValueError:
+                return Response(
+                    {'error': 'start_date must be a date formatted YYYY-MM-DD'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
 
-        # Format results
-        result = [
-            {
-                'muscle_group': item['exercise__muscle_groups__name'],
-                'count': item['count']
-            }
-            for item in muscle_group_counts if item['exercise__muscle_groups__name']
-        ]
+        weighting = request.query_params.get('weighting', 'entries')
+        field = self.MUSCLE_GROUP_WEIGHTINGS.get(weighting)
+        if field is None:
+            return Response(
+                {'error': 'weighting must be one of: entries, sets, volume'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        return Response(result)
+        # Per-exercise totals from the rollup, fanned out to muscle groups in memory
+        weights = dict(ExerciseDailySummary.objects.filter(
+            user=request.user,
+            date__gte=start_date,
+            date__lte=end_date
+        ).values('exercise_id').annotate(
+            weight=Sum(field)
+        ).order_by().values_list('exercise_id', 'weight'))
+
+        return Response(self._muscle_group_counts(weights))
 
-    def _calculate_streak(self, user):
+    @action(detail=False, methods=['get'])
+    @cached_action
+    def dashboard(self, request):
         """
-        Calculate current workout streak (consecutive days)
+        Everything the analytics page shows, in one response
+        Query params: include=comma separated sections (default all of
+        DASHBOARD_SECTIONS); granularity, start_date and end_date apply to
+        volume_trend; muscle_group_start_date to muscle_groups
         """
+        include = request.query_params.get('include')
+        sections = set(self.DASHBOARD_SECTIONS)
+        if include:
+            sections = {name.strip() for name in include.split(',') if name.strip()}
+            if not sections or sections - set(self.DASHBOARD_SECTIONS):
+                return Response(
+                    {'error': 'include must be a comma separated list of: ' + ', '.join(self.DASHBOARD_SECTIONS)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        granularity = request.query_params.get('granularity', 'week')
+        if granularity not in self.VOLUME_TREND_GRANULARITIES:
+            return Response(
+                {'error': 'granularity must be one of: day, week, month'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        user = request.user
         today = timezone.now().date()
-        workouts = Workout.objects.filter(
-            user=user, completed=True
-        ).values_list('date', flat=True).distinct().order_by('-date')
-
-        if not workouts:
-            return 0
-
-        # Check if there's a workout today or yesterday
-        if workouts[0] not in [today, today - timedelta(days=1)]:
-            return 0
-
-        streak = 0
-        current_date = workouts[0]
-
-        for workout_date in workouts:
-            if workout_date == current_date:
-                streak += 1
-                current_date -= timedelta(days=1)
-            elif workout_date < current_date:
-                # Allow for rest days - check if within reasonable gap
-                days_diff = (current_date - workout_date).days
-                if days_diff <= 2:  # Allow up to 2 rest days
-                    streak += 1
-                    current_date = workout_date - timedelta(days=1)
-                else:
-                    break
-            else:
-                break
-
-        return streak
+
+        # Date window each workout-based section needs, with the same
+        # defaults as the standalone actions
+        windows = {}
+        if 'stats' in sections:
+            # Like workout_stats, future-dated workouts count as this week/month
+            windows['stats'] = (min(self._stats_window(today)), date.max)
+        try:
+            if 'volume_trend' in sections:
+                start_date = today - timedelta(weeks=12)
+                end_date = today
+                start_param = request.query_params.get('start_date')
+                end_param = request.query_params.get('end_date')
+                if start_param:
+                    start_date = datetime.strptime(start_param, '%Y-%m-%d').date()
+                if end_param:
+                    end_date = datetime.strptime(end_param, '%Y-%m-%d').date()
+                windows['volume_trend'] = (start_date, end_date)
+            if 'muscle_groups' in sections:
+                start_date = today - timedelta(days=30)
+                start_param = request.query_params.get('muscle_group_start_date')
+                if start_param:
+                    start_date = datetime.strptime(start_param, '%Y-%m-%d').date()
+                windows['muscle_groups'] = (start_date, today)
+        except ValueError:
+            return Response(
+                {'error': 'start_date, end_date and muscle_group_start_date must be dates formatted YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Shared pass over the widest window: completed workout dates, plus
+        # per (workout, exercise) entry counts and volume when needed
+        workout_dates = {}
+        entries = []
+        if windows:
+            window_start = min(start for start, _ in windows.values())
+            window_end = max(end for _, end in windows.values())
+            workout_dates = dict(Workout.objects.filter(
+                user=user, completed=True, date__gte=window_start, date__lte=window_end
+            ).values_list('id', 'date'))
+            if windows.keys() & {'volume_trend', 'muscle_groups'}:
+                entries = list(WorkoutExercise.objects.filter(
+                    workout__user=user,
+                    workout__completed=True,
+                    workout__date__gte=window_start,
+                    workout__date__lte=window_end
+                ).values('workout_id', 'exercise_id').annotate(
+                    entries=Count('id', distinct=True),
+                    volume=Sum(F('sets__weight') * F('sets__reps'))
+                ).order_by())
+
+        data = {}
+        if 'stats' in sections:
+            week_start, month_start = self._stats_window(today)
+            dates = workout_dates.values()
+            summary, most_frequent = run_queries(*self._lifetime_stats_queries(user))
+            data['stats'] = WorkoutStatsSerializer(self._workout_stats_data(
+                user, today,
+                sum(day >= week_start for day in dates),
+                sum(day >= month_start for day in dates),
+                summary, most_frequent,
+            )).data
+
+        if 'volume_trend' in sections:
+            start_date, end_date = windows['volume_trend']
+            truncate = self.DASHBOARD_TRUNCATIONS[granularity]
+            periods = {}
+            for workout_id, day in workout_dates.items():
+                if start_date <= day <= end_date:
+                    period = periods.setdefault(truncate(day), [0, set()])
+                    period[1].add(workout_id)
+            for entry in entries:
+                day = workout_dates.get(entry['workout_id'])
+                if day and start_date <= day <= end_date and entry['volume']:
+                    periods[truncate(day)][0] += entry['volume']
+            data['volume_trend'] = [
+                self._volume_trend_item(granularity, period_start, volume, len(workout_ids))
+                for period_start, (volume, workout_ids) in sorted(periods.items())
+            ]
+
+        if 'muscle_groups' in sections:
+            start_date, end_date = windows['muscle_groups']
+            exercise_entries = defaultdict(int)
+            for entry in entries:
+                day = workout_dates.get(entry['workout_id'])
+                if day and start_date <= day <= end_date:
+                    exercise_entries[entry['exercise_id']] += entry['entries']
+            data['muscle_groups'] = self._muscle_group_counts(exercise_entries)
+
+        if 'personal_records' in sections:
+            records = PersonalRecord.objects.filter(user=user).select_related(
+                'exercise', 'workout'
+            ).order_by('-date_achieved')[:self.DASHBOARD_RECORD_LIMIT]
+            data['personal_records'] = PersonalRecordListSerializer(records, many=True).data
+
+        if 'latest_snapshot' in sections:
+            snapshot = ProgressSnapshot.objects.filter(user=user).order_by('-date').first()
+            data['latest_snapshot'] = ProgressSnapshotSerializer(snapshot).data if snapshot else None
+
+        return Response(data)
+
+    @action(detail=False, methods=['get'])
+    @cached_action
+    def training_load(self, request):
+        """
+        Daily training load with its acute:chronic workload ratio and monotony
+        Returns: acute_days, chronic_days, results (date, load, acute_load,
+        chronic_load, acwr, zone, monotony, strain), one item per day
+        Query params: start_date, end_date (default the last 365 days)
+        """
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=364)
+        try:
+            if request.query_params.get('end_date'):
+                end_date = datetime.strptime(request.query_params['end_date'], '%Y-%m-%d').date()
+                start_date = end_date - timedelta(days=364)
+            if request.query_params.get('start_date'):
+                start_date = datetime.strptime(request.query_params['start_date'], '%Y-%m-%d').date()
+        except ValueError:
+            return Response(
+                {'error': 'start_date and end_date must be dates formatted YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if start_date > end_date:
+            return Response(
+                {'error': 'start_date must not be after end_date'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if (end_date - start_date).days >= self.MAX_TRAINING_LOAD_DAYS:
+            return Response(
+                {'error': f'At most {self.MAX_TRAINING_LOAD_DAYS} days can be requested at once'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response({
+            'acute_days': ACUTE_DAYS,
+            'chronic_days': CHRONIC_DAYS,
+            'results': training_load(request.user, start_date, end_date),
+        })
+
+    @action(detail=False, methods=['get', 'delete'], permission_classes=[IsAdminUser])
+    def cache_stats(self, request):
+        """
+        Hit/miss counters of the analytics response cache (staff only)
+        DELETE resets the counters
+        """
+        if request.method == 'DELETE':
+            reset_cache_stats()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        return Response(get_cache_stats())
+
+    def _progress_options(self, request):
+        """
+        Parse the formula, max_points and date range shared by the progress
+        actions. Returns (options, error_response).
+        """
+        formula = request.query_params.get('formula', 'epley')
+        if formula not in ONE_REP_MAX_FORMULAS:
+            return None, Response(
+                {'error': f"formula must be one of: {', '.join(ONE_REP_MAX_FORMULAS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        max_points = request.query_params.get('max_points')
+        if max_points is not None:
+            if not max_points.isdigit() or int(max_points) < MIN_POINTS:
+                return None, Response(
+                    {'error': f'max_points must be an integer of at least {MIN_POINTS}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            max_points = int(max_points)
+
+        # Get date range (default to last 90 days)
+        end_date = timezone.now().date()
+        start_date = end_date - timedelta(days=90)
+
+        start_param = request.query_params.get('start_date')
+        end_param = request.query_params.get('end_date')
+
+        try:
+            if start_param:
+                start_date = datetime.strptime(start_param, '%Y-%m-%d').date()
+            if end_param:
+                end_date = datetime.strptime(end_param, '%Y-%m-%d').date()
+        except ValueError:
+            return None, Response(
+                {'error': 'start_date and end_date must be dates formatted YYYY-MM-DD'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        options = {
+            'start_date': start_date,
+            'end_date': end_date,
+            'formula': formula,
+            'max_points': max_points,
+        }
+        return options, None
+
+    def _progress_by_exercise(self, user, exercise_ids, start_date, end_date, formula, max_points):
+        """
+        Daily progress for each exercise as {exercise_id: [day, ...]}, read
+        from the rollup in one query
+        """
+        series = {exercise_id: [] for exercise_id in exercise_ids}
+        # Read the pre-aggregated daily rollup instead of raw sets
+        for day in ExerciseDailySummary.objects.filter(
+            user=user,
+            exercise_id__in=exercise_ids,
+            date__gte=start_date,
+            date__lte=end_date,
+            set_count__gt=0
+        ).order_by('exercise_id', 'date').values(
+            'exercise_id', 'date', 'max_weight', 'total_reps', 'total_volume', 'best_one_rep_max'
+        ):
+            series[day.pop('exercise_id')].append(day)
+
+        # The rollup already keeps the best Epley estimate per day; other
+        # formulas are computed over the raw sets in one vectorised pass
+        if formula == 'epley':
+            for days in series.values():
+                for day in days:
+                    day['one_rep_max'] = day.pop('best_one_rep_max') or None
+        else:
+            logged = [exercise_id for exercise_id, days in series.items() if days]
+            best = self._one_rep_max_by_day(
+                user, logged, start_date, end_date, formula
+            ) if logged else {}
+            for exercise_id, days in series.items():
+                for day in days:
+                    del day['best_one_rep_max']
+                    day['one_rep_max'] = best.get((exercise_id, day['date']))
+
+        if max_points:
+            for exercise_id, days in series.items():
+                if len(days) <= max_points:
+                    continue
+                strength = np.array([
+                    float(day['one_rep_max'] or day['max_weight'] or 0) for day in days
+                ])
+                keep = downsample(
+                    self._day_numbers(day['date'] for day in days),
+                    strength,
+                    max_points,
+                    keep=record_indices(strength),
+                )
+                series[exercise_id] = [days[index] for index in keep]
+
+        return series
+
+    def _one_rep_max_by_day(self, user, exercise_ids, start_date, end_date, formula):
+        """
+        Best estimated 1RM per exercise and workout date, as
+        {(exercise_id, date): value}
+        """
+        rows = Set.objects.filter(
+            workout_exercise__workout__user=user,
+            workout_exercise__workout__completed=True,
+            workout_exercise__workout__date__gte=start_date,
+            workout_exercise__workout__date__lte=end_date,
+            workout_exercise__exercise_id__in=exercise_ids
+        ).order_by(
+            'workout_exercise__exercise_id', 'workout_exercise__workout__date'
+        ).values_list(
+            'workout_exercise__exercise_id',
+            'workout_exercise__workout__date',
+            Cast('weight', FloatField()),
+            'reps'
+        )
+        if not rows:
+            return {}
+
+        exercises, dates, weights, reps = zip(*rows)
+        exercises = np.array(exercises)
+        dates = np.array(dates, dtype='datetime64[D]')
+        estimates = one_rep_max(weights, reps, formula)
+
+        # Rows are sorted by exercise, so each exercise is one slice
+        result = {}
+        _, starts = np.unique(exercises, return_index=True)
+        for start, end in zip(starts, [*starts[1:], len(exercises)]):
+            days, best = best_by_group(dates[start:end], estimates[start:end])
+            best = np.round(best, 2)
+            exercise_id = int(exercises[start])
+            result.update(
+                ((exercise_id, day), value)
+                for day, value in zip(days.tolist(), best.tolist())
+                if not math.isnan(value)
+            )
+        return result
+
+    def _stats_window(self, today):
+        """Start of the current week and month"""
+        return today - timedelta(days=today.weekday()), today.replace(day=1)
+
+    def _lifetime_stats_queries(self, user):
+        """
+        Lookups of the user's running totals (None until first built) and the
+        name of their most frequent exercise, as callables for run_queries
+        """
+        return (
+            lambda: UserTrainingSummary.objects.filter(user=user).first(),
+            lambda: self._most_frequent_exercise(user),
+        )
+
+    def _most_frequent_exercise(self, user):
+        return ExerciseFrequency.objects.filter(
+            user=user, session_count__gt=0
+        ).order_by('-session_count', 'exercise_id').values_list(
+            'exercise__name', flat=True
+        ).first()
+
+    def _workout_stats_data(self, user, today, this_week, this_month, summary, most_frequent):
+        """
+        Combine recent workout counts with the user's running totals
+        """
+        # Lifetime totals are maintained as running counters, built from the
+        # rollup table the first time they are needed. The frequencies are
+        # built along with them, so the concurrent lookup found none.
+        if summary is None:
+            summary = rebuild_training_summary(user.pk)
+            most_frequent = self._most_frequent_exercise(user)
+
+        return {
+            'total_workouts': summary.total_workouts,
+            'workouts_this_week': this_week,
+            'workouts_this_month': this_month,
+            'total_volume': summary.total_volume,
+            'total_sets': summary.total_sets,
+            'total_reps': summary.total_reps,
+            'most_frequent_exercise': most_frequent,
+            'current_streak': displayed_streak(summary, today),
+            'longest_streak': summary.longest_streak,
+        }
+
+    def _day_numbers(self, dates):
+        """Dates as day numbers, the x axis for downsampling"""
+        return np.array(list(dates), dtype='datetime64[D]').astype(np.int64)
+
+    def _volume_trend_item(self, granularity, period_start, volume, workouts):
+        item = {
+            'period_start': period_start,
+            'volume': volume or 0,
+            'workouts': workouts,
+        }
+        if granularity == 'week':
+            item['week_start'] = period_start
+        return item
+
+    def _muscle_group_counts(self, weights):
+        """
+        Spread {exercise_id: weight} over muscle groups, heaviest first
+        """
+        totals = get_muscle_group_map(weights).fan_out(weights)
+        return [
+            {'muscle_group': name, 'count': count}
+            for name, count in sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+        ]
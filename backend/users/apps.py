@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'users'
+
+    def ready(self):
+        from woodshop_api import thumbnails
+        thumbnails.register(
+            self.get_model('User'), 'profile_picture', 'profile_picture_thumbnails'
+        )
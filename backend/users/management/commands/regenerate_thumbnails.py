@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from woodshop_api.thumbnails import registered_fields, update_thumbnails
+
+
+def _regenerate(label, pk, image_field, name):
+    try:
+        return update_thumbnails(label, pk, image_field, name)
+    finally:
+        close_old_connections()
+
+
+class Command(BaseCommand):
+    help = 'Generates thumbnails for every stored image of the registered image fields'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            dest='labels',
+            help='Only process the given model, e.g. users.User (may be repeated)'
+        )
+        parser.add_argument(
+            '--missing',
+            action='store_true',
+            help='Skip images whose thumbnails are already up to date'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=max(settings.THUMBNAIL_WORKERS, 1),
+            help='Threads generating thumbnails concurrently'
+        )
+
+    def handle(self, *args, **options):
+        fields = registered_fields()
+        if options['labels']:
+            known = {model._meta.label for model, _, _ in fields}
+            unknown = set(options['labels']) - known
+            if unknown:
+                raise CommandError(
+                    f"No thumbnails registered for {', '.join(sorted(unknown))}; "
+                    f"choose from {', '.join(sorted(known))}"
+                )
+            fields = [field for field in fields if field[0]._meta.label in options['labels']]
+
+        jobs = []
+        for model, image_field, thumbnails_field in fields:
+            rows = model.objects.exclude(**{f'{image_field}__isnull': True}).exclude(
+                **{image_field: ''}
+            ).values_list('pk', image_field, thumbnails_field)
+            for pk, name, thumbnails in rows.iterator():
+                if options['missing'] and (thumbnails or {}).get('source') == name:
+                    continue
+                jobs.append((model._meta.label, pk, image_field, name))
+
+        self.stdout.write(f'Generating thumbnails for {len(jobs)} images')
+        failed = 0
+        with ThreadPoolExecutor(max_workers=max(options['workers'], 1)) as pool:
+            futures = {pool.submit(_regenerate, *job): job for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as error:
+                    failed += 1
+                    label, pk, _, name = futures[future]
+                    self.stderr.write(f'{label} {pk} ({name}): {error}')
+
+        style = self.style.WARNING if failed else self.style.SUCCESS
+        self.stdout.write(style(
+            f'Generated thumbnails for {len(jobs) - failed} images, {failed} failed'
+        ))
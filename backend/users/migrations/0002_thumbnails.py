@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-17 20:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='profile_picture_thumbnails',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Generated thumbnails of profile_picture (see woodshop_api.thumbnails)'),
+        ),
+    ]
@@ -11,6 +11,12 @@ class User(AbstractUser):
     bio = models.TextField(blank=True, null=True)
     date_of_birth = models.DateField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pictures/', blank=True, null=True)
+    profile_picture_thumbnails = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        help_text="Generated thumbnails of profile_picture (see woodshop_api.thumbnails)"
+    )
 
     # Fitness-specific fields
     weight_unit = models.CharField(
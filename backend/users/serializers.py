@@ -2,11 +2,16 @@ from rest_framework import serializers
 from django.contrib.auth import get_user_model
 from django.contrib.auth.password_validation import validate_password
 
+from woodshop_api.images import IngestedImageField
+from woodshop_api.thumbnails import thumbnail_urls
+
 User = get_user_model()
 
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for User profile data"""
+    profile_picture = IngestedImageField(required=False, allow_null=True)
+    profile_picture_thumbnails = serializers.SerializerMethodField()
 
     class Meta:
         model = User
@@ -19,12 +24,17 @@ class UserSerializer(serializers.ModelSerializer):
             'bio',
             'date_of_birth',
             'profile_picture',
+            'profile_picture_thumbnails',
             'weight_unit',
             'created_at',
             'updated_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+    def get_profile_picture_thumbnails(self, obj):
+        """URLs by size and format; empty until generated"""
+        return thumbnail_urls(obj, 'profile_picture', self.context.get('request'))
+
 
 class RegisterSerializer(serializers.ModelSerializer):
     """Serializer for user registration"""
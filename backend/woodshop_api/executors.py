@@ -0,0 +1,23 @@
+"""
+Process-wide thread pools shared by the modules that offload work to
+threads. Each pool is created on first use and lives as long as the process.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+def get_executor(name, max_workers):
+    """
+    The thread pool called name, created with max_workers threads the first
+    time it is requested
+    """
+    with _executors_lock:
+        if name not in _executors:
+            _executors[name] = ThreadPoolExecutor(
+                max_workers=max_workers,
+                thread_name_prefix=name,
+            )
+        return _executors[name]
@@ -0,0 +1,158 @@
+"""
+Sparse fieldsets and opt-in expansion of nested serializers.
+
+GET requests may ask for part of a response:
+
+- ?fields=id,date,exercises.sets.weight renders only the named fields. A
+  dotted path selects fields of a nested serializer; naming a nested field
+  without a path renders all of it.
+- ?expand=exercises.sets renders only the listed nested serializers out of
+  those a serializer declares in Meta.expandable_fields. Where ?expand=
+  lists nothing for a level (it is absent, or names a serializer without a
+  path below it) the ones in Meta.expanded_by_default are rendered.
+- A field named in ?fields= is always rendered, so naming a path expands it.
+
+The queryset is then built from the fields that are left: only() their
+columns, one Prefetch per nested serializer, so a relation that is not
+rendered is never queried. Fields that are not model columns are loaded by
+the callables in the serializer's Meta.field_loaders, keyed by field name,
+which take and return the queryset.
+"""
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+
+
+def parse_paths(value):
+    """Parse 'a,b.c,b.d' into {'a': {}, 'b': {'c': {}, 'd': {}}}"""
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in filter(None, path.strip().split('.')):
+            node = node.setdefault(name, {})
+    return tree
+
+
+def _nested(field):
+    """The serializer a field renders with, if it is a nested one"""
+    if isinstance(field, serializers.ListSerializer):
+        field = field.child
+    return field if isinstance(field, serializers.BaseSerializer) else None
+
+
+def _meta(serializer, option, default=()):
+    return getattr(getattr(serializer, 'Meta', None), option, default)
+
+
+def prune_fields(serializer, fields=None, expand=None, path=''):
+    """
+    Drop the fields of a serializer, and of those nested in it, that were
+    not requested. None stands for a parameter that was not given.
+    """
+    expanded = _meta(serializer, 'expanded_by_default') if expand is None else expand
+    expandable = _meta(serializer, 'expandable_fields')
+
+    for tree in (fields, expand):
+        unknown = set(tree or ()) - set(serializer.fields)
+        if unknown:
+            raise ParseError(f"Unknown field: {path}{sorted(unknown)[0]}")
+
+    for name in list(serializer.fields):
+        if fields is None:
+            keep = name not in expandable or name in expanded
+        else:
+            keep = name in fields
+        if not keep:
+            serializer.fields.pop(name)
+            continue
+        nested = _nested(serializer.fields[name])
+        if nested is not None:
+            # An empty subtree selects all fields and the nested defaults
+            prune_fields(
+                nested,
+                (fields or {}).get(name) or None,
+                (expand or {}).get(name) or None,
+                path=f'{path}{name}.',
+            )
+
+
+def load_fields(queryset, serializer, required=()):
+    """
+    Restrict a queryset to what the serializer renders. required names
+    further columns to load, such as those the rows are ordered by.
+    """
+    opts = queryset.model._meta
+    columns = {opts.pk.name, *required}
+    loaders = _meta(serializer, 'field_loaders', {})
+    restrict = True
+
+    for name, field in serializer.fields.items():
+        if name in loaders:
+            queryset = loaders[name](queryset)
+            continue
+        try:
+            model_field = opts.get_field(field.source.split('.')[0])
+        except FieldDoesNotExist:
+            # Computed from the whole instance
+            restrict = False
+            continue
+
+        nested = _nested(field)
+        if nested is None:
+            if model_field.concrete and '.' not in field.source:
+                columns.add(field.source)
+            else:
+                restrict = False
+        else:
+            # Prefetched rows need the key that joins them to this one
+            required = []
+            if model_field.many_to_one:
+                columns.add(field.source)
+            elif model_field.one_to_many:
+                required.append(model_field.field.name)
+            queryset = queryset.prefetch_related(Prefetch(
+                field.source,
+                queryset=load_fields(
+                    model_field.related_model._default_manager.all(), nested, required
+                ),
+            ))
+
+    return queryset.only(*columns) if restrict else queryset
+
+
+class SparseFieldsetMixin:
+    """
+    ViewSet mixin applying ?fields= and ?expand= to the serializer and the
+    queryset of the list and retrieve actions
+    """
+    sparse_actions = ('list', 'retrieve')
+
+    def _uses_fieldsets(self):
+        return self.request.method in ('GET', 'HEAD') and self.action in self.sparse_actions
+
+    def _requested(self, param):
+        value = self.request.query_params.get(param)
+        return None if value is None else parse_paths(value)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        if self._uses_fieldsets():
+            prune_fields(
+                _nested(serializer), self._requested('fields'), self._requested('expand')
+            )
+        return serializer
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if not self._uses_fieldsets():
+            return queryset
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        prune_fields(serializer, self._requested('fields'), self._requested('expand'))
+        # Pagination reads the ordering columns of each row
+        ordering = [
+            name for name in getattr(self, 'ordering_fields', None) or ()
+            if name != '__all__'
+        ]
+        queryset = queryset.select_related(None).prefetch_related(None)
+        return load_fields(queryset, serializer, required=ordering)
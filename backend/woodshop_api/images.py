@@ -0,0 +1,98 @@
+"""
+Ingestion of uploaded images.
+
+Uploads larger than FILE_UPLOAD_MAX_MEMORY_SIZE are streamed to a temporary
+file by Django, so the request never holds a whole photo in memory. Before
+anything is decoded the upload is checked against IMAGE_UPLOAD_MAX_BYTES and
+its header against IMAGE_UPLOAD_MAX_PIXELS. The image is then downscaled to
+IMAGE_MAX_DIMENSION, rotated upright, stripped of its metadata and
+re-encoded on a small thread pool. Pillow releases the GIL while decoding
+and resampling, and the pool size caps how many images are decoded at once,
+which keeps worker memory flat however many uploads arrive together.
+"""
+import os
+from tempfile import SpooledTemporaryFile
+
+from django.conf import settings
+from django.core.files import File
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageOps, UnidentifiedImageError
+from rest_framework import serializers
+
+from .executors import get_executor
+
+# (format, extension, save options) of stored images
+OPAQUE_OUTPUT = ('JPEG', 'jpg', {'quality': 85, 'optimize': True, 'progressive': True})
+ALPHA_OUTPUT = ('PNG', 'png', {'optimize': True})
+
+ACCEPTED_FORMATS = {'JPEG', 'PNG', 'WEBP', 'GIF', 'BMP', 'TIFF', 'MPO'}
+
+
+class ImageRejected(Exception):
+    pass
+
+
+def normalize_image(source, name):
+    """
+    Decode an image file, downscale, rotate and re-encode it without
+    metadata. Returns a django File backed by a spooled temporary file.
+    """
+    max_dimension = settings.IMAGE_MAX_DIMENSION
+    try:
+        with Image.open(source) as image:
+            # Only the header has been read so far
+            if image.format not in ACCEPTED_FORMATS:
+                raise ImageRejected(f'Unsupported image format: {image.format}.')
+            width, height = image.size
+            if width * height > settings.IMAGE_UPLOAD_MAX_PIXELS:
+                raise ImageRejected(
+                    f'Image is too large ({width}x{height}); at most '
+                    f'{settings.IMAGE_UPLOAD_MAX_PIXELS:,} pixels are accepted.'
+                )
+            icc_profile = image.info.get('icc_profile')
+            has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+
+            # JPEG decoders scale by 1/2, 1/4 or 1/8 while decoding
+            image.draft('RGB', (max_dimension, max_dimension))
+            image.thumbnail((max_dimension, max_dimension), Image.Resampling.LANCZOS)
+            # Rotate the small image; the EXIF block itself is not written back
+            upright = ImageOps.exif_transpose(image)
+            upright = upright.convert('RGBA' if has_alpha else 'RGB')
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError, SyntaxError) as error:
+        raise ImageRejected(
+            'Upload a valid image. The file you uploaded was either not an image '
+            'or a corrupted image.'
+        ) from error
+
+    image_format, extension, options = ALPHA_OUTPUT if has_alpha else OPAQUE_OUTPUT
+    output = SpooledTemporaryFile(max_size=settings.FILE_UPLOAD_MAX_MEMORY_SIZE)
+    upright.save(output, image_format, icc_profile=icc_profile, **options)
+    output.seek(0)
+    root, _ = os.path.splitext(os.path.basename(name))
+    return File(output, name=f'{root}.{extension}')
+
+
+def ingest_image(upload):
+    """
+    Validate an uploaded file and return its normalized replacement, raising
+    ImageRejected when it is refused
+    """
+    if upload.size > settings.IMAGE_UPLOAD_MAX_BYTES:
+        raise ImageRejected(
+            f'Image files may be at most {filesizeformat(settings.IMAGE_UPLOAD_MAX_BYTES)}.'
+        )
+    if settings.IMAGE_INGEST_WORKERS <= 0:
+        return normalize_image(upload, upload.name)
+    executor = get_executor('image-ingest', settings.IMAGE_INGEST_WORKERS)
+    return executor.submit(normalize_image, upload, upload.name).result()
+
+
+class IngestedImageField(serializers.ImageField):
+    """ImageField storing the normalized image instead of the raw upload"""
+
+    def to_internal_value(self, data):
+        upload = serializers.FileField.to_internal_value(self, data)
+        try:
+            return ingest_image(upload)
+        except ImageRejected as error:
+            raise serializers.ValidationError(str(error))
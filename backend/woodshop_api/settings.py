@@ -95,6 +95,34 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Local memory by default; set CACHE_BACKEND to
+# django.core.cache.backends.filebased.FileBasedCache and CACHE_LOCATION to a
+# directory to share cached analytics between worker processes.
+
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='woodshop'),
+    }
+}
+
+# Seconds a cached analytics response may live; entries are invalidated
+# earlier whenever the user writes
+ANALYTICS_CACHE_TIMEOUT = config('ANALYTICS_CACHE_TIMEOUT', default=60 * 60 * 24, cast=int)
+
+# Threads (each with its own database connection) running the independent
+# queries of an analytics request concurrently; 0 runs them in sequence.
+# Without a persistent CONN_MAX_AGE every thread reconnects per query, which
+# costs more than the overlap saves, so only then does it default to 4.
+ANALYTICS_QUERY_WORKERS = config(
+    'ANALYTICS_QUERY_WORKERS',
+    default=4 if DATABASES['default'].get('CONN_MAX_AGE') else 0,
+    cast=int,
+)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -177,3 +205,22 @@ CORS_ALLOW_CREDENTIALS = True
 # Media files (for exercise images, etc.)
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
+
+# Image thumbnails (see woodshop_api.thumbnails): longest side in pixels per
+# size, output formats, and background worker threads (0 = on commit, inline)
+THUMBNAIL_SIZES = {
+    'small': 160,
+    'medium': 480,
+    'large': 1080,
+}
+THUMBNAIL_FORMATS = ['webp', 'jpeg']
+THUMBNAIL_WORKERS = config('THUMBNAIL_WORKERS', default=2, cast=int)
+
+# Image uploads (see woodshop_api.images). Uploads above
+# FILE_UPLOAD_MAX_MEMORY_SIZE are streamed to a temporary file; stored images
+# are downscaled to IMAGE_MAX_DIMENSION on IMAGE_INGEST_WORKERS threads
+FILE_UPLOAD_MAX_MEMORY_SIZE = 2 * 1024 * 1024
+IMAGE_UPLOAD_MAX_BYTES = config('IMAGE_UPLOAD_MAX_BYTES', default=25 * 1024 * 1024, cast=int)
+IMAGE_UPLOAD_MAX_PIXELS = config('IMAGE_UPLOAD_MAX_PIXELS', default=50_000_000, cast=int)
+IMAGE_MAX_DIMENSION = 2560
+IMAGE_INGEST_WORKERS = config('IMAGE_INGEST_WORKERS', default=2, cast=int)
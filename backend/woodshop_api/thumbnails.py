@@ -0,0 +1,196 @@
+"""
+Background thumbnails for uploaded images.
+
+Models register an ImageField together with a JSONField that records the
+generated thumbnails. When a new file is saved, a job is queued on a
+process-wide thread pool once the transaction commits. The job decodes the
+original once and writes every size in settings.THUMBNAIL_SIZES in each
+format of settings.THUMBNAIL_FORMATS, mirroring the original's path under
+thumbnails/. The JSON field then holds {'source': original name, 'sizes':
+{size: {format: storage name}}}. Until the job finishes the field is empty
+and clients fall back to the original. Thumbnails of a replaced or cleared
+image are deleted from storage once the change commits.
+
+Set THUMBNAIL_WORKERS to 0 to generate thumbnails synchronously on commit.
+"""
+import logging
+import os
+from io import BytesIO
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models.signals import post_save, pre_save
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+from .executors import get_executor
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+
+# Sent with sender=model, pk and image_field once new thumbnails are recorded
+thumbnails_updated = Signal()
+
+# (model label, image field) -> thumbnails JSON field
+_registry = {}
+
+
+def register(model, image_field, thumbnails_field):
+    """Generate thumbnails for model.image_field whenever a new file is saved"""
+    _registry[(model._meta.label, image_field)] = thumbnails_field
+
+    def capture_upload(sender, instance, update_fields=None, **kwargs):
+        if update_fields is not None and image_field not in update_fields:
+            return
+        image = getattr(instance, image_field)
+        # FileField commits new uploads in its own pre_save, after this signal
+        instance._thumbnail_pending = bool(image) and not image._committed
+        if not image or instance._thumbnail_pending:
+            previous = getattr(instance, thumbnails_field)
+            if instance.pk and (previous or instance._thumbnail_pending):
+                # A job may have recorded thumbnails since the instance was loaded
+                previous = model.objects.filter(pk=instance.pk).values_list(
+                    thumbnails_field, flat=True
+                ).first()
+            instance._thumbnail_stale = previous
+            setattr(instance, thumbnails_field, {})
+
+    def schedule(sender, instance, **kwargs):
+        stale = getattr(instance, '_thumbnail_stale', None)
+        if stale:
+            instance._thumbnail_stale = None
+            storage = model._meta.get_field(image_field).storage
+            transaction.on_commit(lambda: delete_thumbnails(storage, stale))
+        if getattr(instance, '_thumbnail_pending', False):
+            instance._thumbnail_pending = False
+            name = getattr(instance, image_field).name
+            transaction.on_commit(
+                lambda: submit(model._meta.label, instance.pk, image_field, name)
+            )
+
+    dispatch_uid = f'thumbnails:{model._meta.label}.{image_field}'
+    pre_save.connect(capture_upload, sender=model, weak=False, dispatch_uid=dispatch_uid)
+    post_save.connect(schedule, sender=model, weak=False, dispatch_uid=dispatch_uid)
+
+
+def registered_fields():
+    """[(model, image_field, thumbnails_field)] for every registration"""
+    return [
+        (apps.get_model(label), image_field, thumbnails_field)
+        for (label, image_field), thumbnails_field in _registry.items()
+    ]
+
+
+def submit(label, pk, image_field, name):
+    """Queue thumbnail generation for one stored image"""
+    if settings.THUMBNAIL_WORKERS <= 0:
+        update_thumbnails(label, pk, image_field, name)
+    else:
+        executor = get_executor('thumbnails', settings.THUMBNAIL_WORKERS)
+        executor.submit(_run_job, label, pk, image_field, name)
+
+
+def _run_job(label, pk, image_field, name):
+    try:
+        update_thumbnails(label, pk, image_field, name)
+    except Exception:
+        logger.exception('Thumbnail generation failed for %s', name)
+    finally:
+        # Worker threads hold their own connections
+        close_old_connections()
+
+
+def thumbnail_name(name, size, extension):
+    root, _ = os.path.splitext(name)
+    return f'thumbnails/{root}_{size}.{extension}'
+
+
+def _encode(image, format_name):
+    image_format, options = FORMATS[format_name]
+    if image_format == 'JPEG' and image.mode != 'RGB':
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+        image = background
+    buffer = BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def generate_thumbnails(storage, name):
+    """
+    Write every configured size and format of a stored image and return
+    {size: {format: storage name}}
+    """
+    sizes = sorted(settings.THUMBNAIL_SIZES.items(), key=lambda item: -item[1])
+    with storage.open(name, 'rb') as handle:
+        with Image.open(handle) as original:
+            # Let the JPEG decoder downscale while decoding; far cheaper than
+            # a full-resolution decode for camera photos
+            original.draft('RGB', (sizes[0][1], sizes[0][1]))
+            image = ImageOps.exif_transpose(original)
+            has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+
+    result = {}
+    # Largest first, each size resampled from the previous one
+    for size_name, size in sizes:
+        image.thumbnail((size, size), Image.Resampling.LANCZOS)
+        result[size_name] = {}
+        for format_name in settings.THUMBNAIL_FORMATS:
+            target = thumbnail_name(name, size_name, format_name)
+            if storage.exists(target):
+                storage.delete(target)
+            result[size_name][format_name] = storage.save(
+                target, ContentFile(_encode(image, format_name))
+            )
+    return result
+
+
+def delete_thumbnails(storage, thumbnails):
+    """Delete the files of a recorded thumbnails value from storage"""
+    for formats in (thumbnails or {}).get('sizes', {}).values():
+        for name in formats.values():
+            storage.delete(name)
+
+
+def update_thumbnails(label, pk, image_field, name):
+    """
+    Generate thumbnails for a stored image and record them, unless the
+    instance has moved on to another file meanwhile
+    """
+    model = apps.get_model(label)
+    thumbnails_field = _registry[(label, image_field)]
+    storage = model._meta.get_field(image_field).storage
+    thumbnails = {'source': name, 'sizes': generate_thumbnails(storage, name)}
+    updated = model.objects.filter(pk=pk, **{image_field: name}).update(
+        **{thumbnails_field: thumbnails}
+    )
+    if updated:
+        thumbnails_updated.send(sender=model, pk=pk, image_field=image_field)
+    else:
+        # The image was replaced or cleared while the job ran
+        delete_thumbnails(storage, thumbnails)
+    return thumbnails
+
+
+def thumbnail_urls(instance, image_field, request=None):
+    """{size: {format: url}} for the current thumbnails of an image field"""
+    thumbnails = getattr(instance, _registry[(instance._meta.label, image_field)]) or {}
+    storage = instance._meta.get_field(image_field).storage
+
+    def absolute(url):
+        return request.build_absolute_uri(url) if request else url
+
+    return {
+        size_name: {
+            format_name: absolute(storage.url(name))
+            for format_name, name in formats.items()
+        }
+        for size_name, formats in thumbnails.get('sizes', {}).items()
+    }
@@ -0,0 +1,85 @@
+"""
+Streaming exports of a user's logged sets, one row per set.
+
+Rows come straight from a values_list() iterator, so only one chunk of
+rows is held in memory at a time however long the history is.
+"""
+import csv
+import json
+from itertools import islice
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import Set
+
+EXPORT_COLUMNS = [
+    ('date', 'workout_exercise__workout__date'),
+    ('workout_id', 'workout_exercise__workout_id'),
+    ('workout', 'workout_exercise__workout__name'),
+    ('exercise', 'workout_exercise__exercise__name'),
+    ('set_number', 'set_number'),
+    ('reps', 'reps'),
+    ('weight', 'weight'),
+    ('rpe', 'rpe'),
+]
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Rows joined into each chunk written to the client
+LINES_PER_CHUNK = 500
+
+# Spreadsheets evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_rows(workouts):
+    """Iterate (date, workout_id, workout, exercise, set_number, reps, weight, rpe) tuples"""
+    return Set.objects.filter(
+        workout_exercise__workout__in=workouts.values('pk')
+    ).order_by(
+        'workout_exercise__workout__date',
+        'workout_exercise__workout_id',
+        'workout_exercise__order',
+        'workout_exercise_id',
+        'set_number',
+    ).values_list(
+        *(field for _, field in EXPORT_COLUMNS)
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+
+class _Echo:
+    """File-like object handing back whatever csv.writer writes to it"""
+    def write(self, value):
+        return value
+
+
+def _safe_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    yield writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow([_safe_cell(value) for value in row])
+
+
+def ndjson_lines(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + '\n'
+
+
+def chunked(lines):
+    """Join lines into larger chunks so the response is not written row by row"""
+    lines = iter(lines)
+    while chunk := ''.join(islice(lines, LINES_PER_CHUNK)):
+        yield chunk
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv', csv_lines),
+    'ndjson': ('application/x-ndjson', ndjson_lines),
+}
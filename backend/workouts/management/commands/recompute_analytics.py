@@ -0,0 +1,177 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+
+import django
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+
+from analytics.cache import bump_data_version
+from analytics.models import PersonalRecord
+from analytics.records import recompute_personal_records
+from analytics.rollups import rebuild_user_summaries
+from workouts.models import WorkoutExercise
+
+User = get_user_model()
+
+
+def _init_worker():
+    # Needed when the pool spawns rather than forks its workers
+    django.setup()
+
+
+def recompute_users(user_ids, chunk_size):
+    """
+    Rebuild the rollups, counters, streaks and detected personal records of
+    some users. Returns (user_ids, rollup rows written).
+    """
+    rows = 0
+    for user_id in user_ids:
+        rows += rebuild_user_summaries(user_id, batch_size=chunk_size)
+
+        exercise_ids = set(
+            WorkoutExercise.objects.filter(workout__user_id=user_id).values_list(
+                'exercise_id', flat=True
+            ).distinct()
+        )
+        # Exercises no longer logged may still carry stale detected records
+        exercise_ids.update(
+            PersonalRecord.objects.filter(user_id=user_id, is_automatic=True).values_list(
+                'exercise_id', flat=True
+            )
+        )
+        if exercise_ids:
+            recompute_personal_records(user_id, exercise_ids, chunk_size=chunk_size)
+
+    bump_data_version(user_ids)
+    return user_ids, rows
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuilds all derived analytics data (daily rollups, training summaries, '
+        'streaks and detected personal records) using a pool of worker processes'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='user_ids',
+            help='Only recompute the given user id (may be repeated)'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help=(
+                'Worker processes (default: one per CPU, or 1 on SQLite, which '
+                'serialises writers); 1 runs everything in this process'
+            )
+        )
+        parser.add_argument(
+            '--users-per-task',
+            type=int,
+            default=25,
+            help='Users handed to a worker at a time, and checkpointed together'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=2000,
+            help='Rows fetched and written per database round trip'
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default='recompute_analytics.checkpoint',
+            help='File recording finished users, used to resume an interrupted run'
+        )
+        parser.add_argument(
+            '--restart',
+            action='store_true',
+            help='Ignore an existing checkpoint and recompute every user'
+        )
+
+    def handle(self, *args, **options):
+        for name in ('workers', 'users_per_task', 'chunk_size'):
+            if options[name] is not None and options[name] < 1:
+                raise CommandError(f"--{name.replace('_', '-')} must be a positive integer")
+
+        workers = options['workers']
+        if workers is None:
+            workers = 1 if connection.vendor == 'sqlite' else os.cpu_count() or 1
+
+        checkpoint = options['checkpoint']
+        finished = set()
+        if options['restart'] and os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elif os.path.exists(checkpoint):
+            with open(checkpoint) as handle:
+                finished = {int(line) for line in handle if line.strip()}
+            self.stdout.write(f'Resuming: {len(finished)} users already done')
+
+        users = User.objects.order_by('pk')
+        if options['user_ids']:
+            users = users.filter(pk__in=options['user_ids'])
+        user_ids = [pk for pk in users.values_list('pk', flat=True) if pk not in finished]
+        if not user_ids:
+            self.stdout.write(self.style.SUCCESS('Nothing to recompute'))
+            return
+
+        iterator = iter(user_ids)
+        tasks = []
+        while task := list(islice(iterator, options['users_per_task'])):
+            tasks.append(task)
+
+        self.stdout.write(
+            f'Recomputing {len(user_ids)} users in {len(tasks)} tasks '
+            f'with {workers} workers'
+        )
+        started = time.monotonic()
+        done_users = 0
+        done_rows = 0
+
+        def record(task_user_ids, rows):
+            nonlocal done_users, done_rows
+            with open(checkpoint, 'a') as handle:
+                handle.write(''.join(f'{user_id}\n' for user_id in task_user_ids))
+            done_users += len(task_user_ids)
+            done_rows += rows
+            elapsed = max(time.monotonic() - started, 1e-6)
+            self.stdout.write(
+                f'{done_users}/{len(user_ids)} users, {done_rows} rollup rows '
+                f'({done_users / elapsed:.1f} users/s, {done_rows / elapsed:.0f} rows/s)'
+            )
+
+        try:
+            if workers <= 1:
+                for task in tasks:
+                    record(*recompute_users(task, options['chunk_size']))
+            else:
+                # Workers open their own connections; never share the parent's
+                connections.close_all()
+                with ProcessPoolExecutor(
+                    max_workers=workers, initializer=_init_worker
+                ) as pool:
+                    futures = [
+                        pool.submit(recompute_users, task, options['chunk_size'])
+                        for task in tasks
+                    ]
+                    try:
+                        for future in as_completed(futures):
+                            record(*future.result())
+                    except BaseException:
+                        pool.shutdown(wait=True, cancel_futures=True)
+                        raise
+        except KeyboardInterrupt:
+            self.stderr.write(f'Interrupted; rerun to resume from {checkpoint}')
+            return
+
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        self.stdout.write(self.style.SUCCESS(
+            f'Recomputed {done_users} users ({done_rows} rollup rows) '
+            f'in {time.monotonic() - started:.1f}s'
+        ))
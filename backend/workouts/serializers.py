@@ -1,6 +1,22 @@
+from collections import Counter
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, DecimalField, F, Prefetch, Q, Sum, Value
+from django.db.models.functions import Coalesce
 from rest_framework import serializers
 from .models import MuscleGroup, Exercise, Workout, WorkoutExercise, Set
 
+# Upper bounds for a workout logged in one request
+MAX_LOGGED_EXERCISES = 50
+MAX_LOGGED_SETS = 100
+
+# Upper bound for the operations of one set batch
+MAX_BATCH_OPERATIONS = 500
+
+# Set columns loaded for the sets a batch touches
+SET_FIELDS = ['id', 'set_number', 'reps', 'weight', 'rpe', 'completed', 'notes', 'created_at']
+
 
 class MuscleGroupSerializer(serializers.ModelSerializer):
     """Serializer for muscle groups"""
@@ -64,6 +80,11 @@ class ExerciseListSerializer(serializers.ModelSerializer):
             'muscle_group_names',
             'equipment_needed',
         ]
+        field_loaders = {
+            'muscle_group_names': lambda queryset: queryset.prefetch_related(
+                Prefetch('muscle_groups', queryset=MuscleGroup.objects.only('name'))
+            ),
+        }
 
     def get_muscle_group_names(self, obj):
         return [mg.name for mg in obj.muscle_groups.all()]
@@ -88,6 +109,156 @@ class SetSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'created_at']
 
 
+class SetBatchCreateSerializer(serializers.ModelSerializer):
+    """A set created by a batch"""
+    # Ownership of all workout exercises is checked in one query by SetBatchSerializer
+    workout_exercise = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Set
+        fields = ['workout_exercise', 'set_number', 'reps', 'weight', 'rpe', 'completed', 'notes']
+        # Set numbers are checked against the final state of the whole batch
+        validators = []
+
+
+class SetBatchUpdateSerializer(serializers.ModelSerializer):
+    """Changed fields of a set updated by a batch"""
+    id = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Set
+        fields = ['id', 'set_number', 'reps', 'weight', 'rpe', 'completed', 'notes']
+        extra_kwargs = {
+            'set_number': {'required': False},
+            'reps': {'required': False},
+            'weight': {'required': False},
+        }
+
+
+class SetBatchSerializer(serializers.Serializer):
+    """
+    Sets to create, update and delete together. Set numbers only have to be
+    unique once every operation is applied, so sets can be renumbered freely.
+    """
+    create = SetBatchCreateSerializer(many=True, required=False)
+    update = SetBatchUpdateSerializer(many=True, required=False)
+    delete = serializers.ListField(child=serializers.IntegerField(min_value=1), required=False)
+
+    def validate(self, attrs):
+        creates = attrs.setdefault('create', [])
+        updates = attrs.setdefault('update', [])
+        deletes = attrs.setdefault('delete', [])
+        operation_count = len(creates) + len(updates) + len(deletes)
+        if not operation_count:
+            raise serializers.ValidationError('Provide at least one set to create, update or delete.')
+        if operation_count > MAX_BATCH_OPERATIONS:
+            raise serializers.ValidationError(
+                f'At most {MAX_BATCH_OPERATIONS} operations can be applied at once.'
+            )
+
+        update_ids = [item['id'] for item in updates]
+        set_ids = set(update_ids) | set(deletes)
+        if len(set_ids) != len(update_ids) + len(deletes):
+            raise serializers.ValidationError('Each set can only be updated or deleted once.')
+        workout_exercise_ids = {item['workout_exercise'] for item in creates}
+
+        # Ownership, and the current sets of every workout exercise involved,
+        # in one query
+        user = self.context['request'].user
+        involved = WorkoutExercise.objects.filter(
+            Q(pk__in=workout_exercise_ids) | Q(sets__pk__in=set_ids),
+            workout__user=user,
+        ).values('pk')
+        self.workout_exercise_rows = {}
+        self.existing_sets = {}
+        for row in WorkoutExercise.objects.filter(pk__in=involved).values_list(
+            'pk', 'workout__user_id', 'exercise_id', 'workout__date', 'workout__completed',
+            *(f'sets__{field}' for field in SET_FIELDS)
+        ):
+            self.workout_exercise_rows[row[0]] = row[1:5]
+            if row[5] is not None:
+                self.existing_sets[row[5]] = Set(
+                    workout_exercise_id=row[0], **dict(zip(SET_FIELDS, row[5:]))
+                )
+
+        errors = [
+            f'Workout exercise {workout_exercise_id} not found.'
+            for workout_exercise_id in sorted(workout_exercise_ids - self.workout_exercise_rows.keys())
+        ]
+        errors.extend(
+            f'Set {set_id} not found.'
+            for set_id in sorted(set_ids - self.existing_sets.keys())
+        )
+        if errors:
+            raise serializers.ValidationError(errors)
+
+        numbers = {
+            set_id: (instance.workout_exercise_id, instance.set_number)
+            for set_id, instance in self.existing_sets.items()
+            if set_id not in deletes
+        }
+        for item in updates:
+            if 'set_number' in item:
+                numbers[item['id']] = (numbers[item['id']][0], item['set_number'])
+        final = list(numbers.values()) + [
+            (item['workout_exercise'], item['set_number']) for item in creates
+        ]
+        duplicates = [key for key, count in Counter(final).items() if count > 1]
+        if duplicates:
+            raise serializers.ValidationError([
+                f'Set number {set_number} would be used more than once in '
+                f'workout exercise {workout_exercise_id}.'
+                for workout_exercise_id, set_number in sorted(duplicates)
+            ])
+        return attrs
+
+    def apply(self):
+        """Apply the validated operations; call inside a transaction"""
+        validated_data = self.validated_data
+        deletes = validated_data['delete']
+        if deletes:
+            Set.objects.filter(pk__in=deletes).delete()
+
+        # Above every number in use before and after the batch
+        offset = 1 + max(
+            [instance.set_number for instance in self.existing_sets.values()]
+            + [item['set_number'] for item in validated_data['update'] if 'set_number' in item]
+            + [item['set_number'] for item in validated_data['create']]
+        )
+
+        updated = []
+        renumbered = []
+        for item in validated_data['update']:
+            instance = self.existing_sets[item['id']]
+            if item.get('set_number', instance.set_number) != instance.set_number:
+                renumbered.append(instance)
+            for field, value in item.items():
+                setattr(instance, field, value)
+            updated.append(instance)
+
+        if renumbered:
+            # The unique constraint is checked row by row, so renumbered sets
+            # first move to numbers nothing else uses
+            Set.objects.bulk_update(
+                [
+                    Set(pk=instance.pk, set_number=offset + index)
+                    for index, instance in enumerate(renumbered)
+                ],
+                ['set_number'],
+            )
+        fields = sorted({field for item in validated_data['update'] for field in item} - {'id'})
+        if updated and fields:
+            Set.objects.bulk_update(updated, fields)
+
+        created = Set.objects.bulk_create([
+            Set(workout_exercise_id=item['workout_exercise'], **{
+                field: value for field, value in item.items() if field != 'workout_exercise'
+            })
+            for item in validated_data['create']
+        ])
+        return {'created': created, 'updated': updated, 'deleted': deletes}
+
+
 class WorkoutExerciseSerializer(serializers.ModelSerializer):
     """Serializer for workout exercises with sets"""
     sets = SetSerializer(many=True, read_only=True)
@@ -105,6 +276,8 @@ class WorkoutExerciseSerializer(serializers.ModelSerializer):
             'sets',
         ]
         read_only_fields = ['id']
+        expandable_fields = ['sets', 'exercise_detail']
+        expanded_by_default = ['sets', 'exercise_detail']
 
 
 class WorkoutExerciseCreateSerializer(serializers.ModelSerializer):
@@ -136,6 +309,8 @@ class WorkoutSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['id', 'user', 'created_at', 'updated_at']
+        expandable_fields = ['exercises']
+        expanded_by_default = ['exercises']
 
     def create(self, validated_data):
         # Set user to current user
@@ -143,10 +318,120 @@ class WorkoutSerializer(serializers.ModelSerializer):
         return super().create(validated_data)
 
 
+class WorkoutLogSetSerializer(serializers.ModelSerializer):
+    """A set of a logged workout; set_number defaults to its position"""
+
+    class Meta:
+        model = Set
+        fields = ['set_number', 'reps', 'weight', 'rpe', 'completed', 'notes']
+        extra_kwargs = {'set_number': {'required': False}}
+
+
+class WorkoutLogExerciseSerializer(serializers.ModelSerializer):
+    """An exercise of a logged workout; order defaults to its position"""
+    # Resolved for the whole workout in one query by WorkoutLogSerializer
+    exercise = serializers.IntegerField(min_value=1)
+    sets = WorkoutLogSetSerializer(many=True, required=False, max_length=MAX_LOGGED_SETS)
+
+    class Meta:
+        model = WorkoutExercise
+        fields = ['exercise', 'order', 'notes', 'sets']
+        extra_kwargs = {'order': {'required': False}}
+
+
+class WorkoutLogSerializer(serializers.ModelSerializer):
+    """
+    A whole workout with its exercises and sets, validated up front and
+    written in one transaction with one bulk insert per table
+    """
+    exercises = WorkoutLogExerciseSerializer(many=True, max_length=MAX_LOGGED_EXERCISES)
+
+    class Meta:
+        model = Workout
+        fields = [
+            'program',
+            'date',
+            'name',
+            'notes',
+            'duration_minutes',
+            'completed',
+            'exercises',
+        ]
+
+    def validate_exercises(self, exercises):
+        errors = []
+        positions = set()
+        for index, item in enumerate(exercises):
+            item.setdefault('order', index)
+            item_errors = {}
+            if (item['exercise'], item['order']) in positions:
+                item_errors['order'] = ['This exercise is already logged at this position.']
+            positions.add((item['exercise'], item['order']))
+
+            set_numbers = set()
+            for set_index, set_data in enumerate(item.get('sets', [])):
+                set_data.setdefault('set_number', set_index + 1)
+                if set_data['set_number'] in set_numbers:
+                    item_errors['sets'] = [
+                        f"Set number {set_data['set_number']} is used more than once."
+                    ]
+                set_numbers.add(set_data['set_number'])
+            errors.append(item_errors)
+
+        user = self.context['request'].user
+        exercise_ids = {item['exercise'] for item in exercises}
+        visible = set(Exercise.objects.filter(
+            Q(created_by__isnull=True) | Q(created_by=user) | Q(is_public=True),
+            pk__in=exercise_ids
+        ).values_list('pk', flat=True))
+        for item, item_errors in zip(exercises, errors):
+            if item['exercise'] not in visible:
+                item_errors['exercise'] = [f"Invalid pk \"{item['exercise']}\" - object does not exist."]
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return exercises
+
+    def create(self, validated_data):
+        exercises = validated_data.pop('exercises')
+        with transaction.atomic():
+            workout = Workout.objects.create(**validated_data)
+            workout_exercises = WorkoutExercise.objects.bulk_create([
+                WorkoutExercise(
+                    workout=workout,
+                    exercise_id=item['exercise'],
+                    order=item['order'],
+                    notes=item.get('notes'),
+                )
+                for item in exercises
+            ])
+            Set.objects.bulk_create([
+                Set(workout_exercise=workout_exercise, **set_data)
+                for workout_exercise, item in zip(workout_exercises, exercises)
+                for set_data in item.get('sets', [])
+            ])
+        return workout
+
+
+def _total_volume(queryset):
+    return queryset.annotate(total_volume=Coalesce(
+        Sum(F('exercises__sets__weight') * F('exercises__sets__reps')),
+        Value(Decimal('0')),
+        output_field=DecimalField(max_digits=14, decimal_places=2),
+    ))
+
+
 class WorkoutListSerializer(serializers.ModelSerializer):
-    """Lighter serializer for workout lists"""
-    exercise_count = serializers.SerializerMethodField()
-    total_sets = serializers.SerializerMethodField()
+    """
+    Lighter serializer for workout lists. The counts and volume are
+    annotated and only exercise names are prefetched; the exercises
+    themselves are only rendered with ?expand=exercises.
+    """
+    exercise_count = serializers.IntegerField(read_only=True)
+    total_sets = serializers.IntegerField(read_only=True)
+    total_volume = serializers.DecimalField(max_digits=14, decimal_places=2, read_only=True)
+    exercise_names = serializers.SerializerMethodField()
+    exercises = WorkoutExerciseSerializer(many=True, read_only=True)
 
     class Meta:
         model = Workout
@@ -158,10 +443,28 @@ class WorkoutListSerializer(serializers.ModelSerializer):
             'duration_minutes',
             'exercise_count',
             'total_sets',
+            'total_volume',
+            'exercise_names',
+            'exercises',
         ]
+        expandable_fields = ['exercises']
+        field_loaders = {
+            'exercise_count': lambda queryset: queryset.annotate(
+                exercise_count=Count('exercises', distinct=True)
+            ),
+            'total_sets': lambda queryset: queryset.annotate(total_sets=Count('exercises__sets')),
+            'total_volume': _total_volume,
+            'exercise_names': lambda queryset: queryset.prefetch_related(Prefetch(
+                'exercises',
+                queryset=WorkoutExercise.objects.select_related('exercise').only(
+                    'workout', 'order', 'exercise__name'
+                ),
+                to_attr='named_exercises',
+            )),
+        }
 
-    def get_exercise_count(self, obj):
-        return obj.exercises.count()
-
-    def get_total_sets(self, obj):
-        return sum(we.sets.count() for we in obj.exercises.all())
+    def get_exercise_names(self, obj):
+        workout_exercises = getattr(obj, 'named_exercises', None)
+        if workout_exercises is None:
+            workout_exercises = obj.exercises.all()
+        return ', '.join(workout_exercise.exercise.name for workout_exercise in workout_exercises)
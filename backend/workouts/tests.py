@@ -1,3 +1,462 @@
-from django.test import TestCase
+import csv
+import json
+import os
+import tempfile
+from datetime import date, timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+
+from analytics.models import ExerciseDailySummary, PersonalRecord
+from .exports import EXPORT_COLUMNS
+from .serializers import MAX_LOGGED_SETS
+from .models import Exercise, Set, Workout, WorkoutExercise
+
+User = get_user_model()
+
+
+class WorkoutsTestCase(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='lifter@example.com', username='lifter', password='password'
+        )
+        self.client.force_authenticate(self.user)
+        self.bench = Exercise.objects.create(name='Bench')
+
+
+class SetBatchTests(WorkoutsTestCase):
+    def setUp(self):
+        super().setUp()
+        workout = Workout.objects.create(user=self.user, date=date(2026, 1, 5))
+        self.workout_exercise = WorkoutExercise.objects.create(
+            workout=workout, exercise=self.bench, order=0
+        )
+        self.first = Set.objects.create(
+            workout_exercise=self.workout_exercise, set_number=1, reps=5, weight=Decimal('100')
+        )
+        self.second = Set.objects.create(
+            workout_exercise=self.workout_exercise, set_number=2, reps=3, weight=Decimal('110')
+        )
+
+    def set_numbers(self):
+        return dict(
+            Set.objects.filter(workout_exercise=self.workout_exercise)
+            .values_list('pk', 'set_number')
+        )
+
+    def test_swap_set_numbers(self):
+        response = self.client.post('/api/sets/batch/', {
+            'update': [
+                {'id': self.first.pk, 'set_number': 2},
+                {'id': self.second.pk, 'set_number': 1},
+            ],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.set_numbers(), {self.first.pk: 2, self.second.pk: 1})
+
+    def test_create_into_number_freed_by_update(self):
+        response = self.client.post('/api/sets/batch/', {
+            'update': [{'id': self.second.pk, 'set_number': 3}],
+            'create': [{
+                'workout_exercise': self.workout_exercise.pk,
+                'set_number': 2,
+                'reps': 8,
+                'weight': '90',
+            }],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(sorted(self.set_numbers().values()), [1, 2, 3])
+
+    def test_duplicate_final_numbers_rejected(self):
+        response = self.client.post('/api/sets/batch/', {
+            'update': [{'id': self.first.pk, 'set_number': 2}],
+        }, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.set_numbers(), {self.first.pk: 1, self.second.pk: 2})
+
+    def test_refreshes_rollups(self):
+        Workout.objects.filter(pk=self.workout_exercise.workout_id).update(completed=True)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/sets/batch/', {
+                'update': [{'id': self.second.pk, 'weight': '120'}],
+                'delete': [self.first.pk],
+            }, format='json')
+
+        self.assertEqual(response.data['deleted'], [self.first.pk])
+        summary = ExerciseDailySummary.objects.get(user=self.user, exercise=self.bench)
+        self.assertEqual((summary.set_count, summary.max_weight), (1, Decimal('120')))
+
+
+
+class RecomputeAnalyticsTests(WorkoutsTestCase):
+    def setUp(self):
+        super().setUp()
+        workout = Workout.objects.create(user=self.user, date=date(2026, 1, 5), completed=True)
+        workout_exercise = WorkoutExercise.objects.create(
+            workout=workout, exercise=self.bench, order=0
+        )
+        Set.objects.create(
+            workout_exercise=workout_exercise, set_number=1, reps=5, weight=Decimal('100')
+        )
+        # Start from nothing derived, as after a restore
+        ExerciseDailySummary.objects.all().delete()
+        PersonalRecord.objects.all().delete()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.checkpoint = os.path.join(directory.name, 'checkpoint')
+
+    def recompute(self, *args):
+        out = StringIO()
+        call_command(
+            'recompute_analytics', '--checkpoint', self.checkpoint, *args, stdout=out
+        )
+        return out.getvalue()
+
+    def test_rebuilds_and_removes_checkpoint(self):
+        self.recompute('--workers', '1')
+
+        summary = ExerciseDailySummary.objects.get(user=self.user, exercise=self.bench)
+        self.assertEqual(summary.max_weight, Decimal('100'))
+        self.assertTrue(
+            PersonalRecord.objects.filter(user=self.user, record_type='max_weight').exists()
+        )
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_resumes_from_checkpoint(self):
+        with open(self.checkpoint, 'w') as handle:
+            handle.write(f'{self.user.pk}\n')
+
+        output = self.recompute()
+
+        self.assertIn('Nothing to recompute', output)
+        self.assertFalse(ExerciseDailySummary.objects.exists())
+
+    def test_rejects_non_positive_options(self):
+        for option in ('--workers', '--users-per-task', '--chunk-size'):
+            with self.assertRaisesMessage(CommandError, option):
+                self.recompute(option, '0')
+
+
+class ExportTests(WorkoutsTestCase):
+    def setUp(self):
+        super().setUp()
+        squat = Exercise.objects.create(name='=Squat')
+        self.log(date(2026, 1, 6), 'Legs', {squat: [(140, 5)]})
+        self.log(date(2026, 1, 5), 'Push', {self.bench: [(100, 5), ('102.5', 3)]})
+        other = User.objects.create_user(
+            email='other@example.com', username='other', password='password'
+        )
+        self.log(date(2026, 1, 5), 'Theirs', {self.bench: [(60, 5)]}, user=other)
+
+    def log(self, day, name, sets, user=None):
+        workout = Workout.objects.create(user=user or self.user, date=day, name=name)
+        for order, (exercise, exercise_sets) in enumerate(sets.items()):
+            workout_exercise = WorkoutExercise.objects.create(
+                workout=workout, exercise=exercise, order=order
+            )
+            for number, (weight, reps) in enumerate(exercise_sets, start=1):
+                Set.objects.create(
+                    workout_exercise=workout_exercise,
+                    set_number=number,
+                    weight=Decimal(weight),
+                    reps=reps,
+                )
+
+    def export(self, **params):
+        response = self.client.get('/api/workouts/export/', params)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('attachment;', response['Content-Disposition'])
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_csv(self):
+        response, content = self.export()
+
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(content.splitlines()))
+        self.assertEqual(rows[0], [name for name, _ in EXPORT_COLUMNS])
+        self.assertEqual(
+            [(row[0], row[2], row[3], row[4], row[6]) for row in rows[1:]],
+            [
+                ('2026-01-05', 'Push', 'Bench', '1', '100.00'),
+                ('2026-01-05', 'Push', 'Bench', '2', '102.50'),
+                # Escaped so spreadsheets do not evaluate it
+                ('2026-01-06', 'Legs', "'=Squat", '1', '140.00'),
+            ],
+        )
+
+    def test_ndjson_with_filters(self):
+        response, content = self.export(file_format='ndjson', date_from='2026-01-06')
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['exercise'], '=Squat')
+        self.assertEqual(rows[0]['weight'], '140.00')
+        self.assertIsNone(rows[0]['rpe'])
+
+    def test_unknown_format(self):
+        response = self.client.get('/api/workouts/export/', {'file_format': 'xlsx'})
+        self.assertEqual(response.status_code, 400)
+
+
+class WorkoutLogTests(WorkoutsTestCase):
+    def log(self, exercises, **fields):
+        payload = {'date': '2026-01-05', 'completed': True, 'exercises': exercises, **fields}
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post('/api/workouts/log/', payload, format='json')
+
+    def test_creates_everything_in_one_request(self):
+        squat = Exercise.objects.create(name='Squat')
+
+        response = self.log([
+            {'exercise': self.bench.pk, 'sets': [
+                {'reps': 5, 'weight': '100'}, {'reps': 3, 'weight': '110'},
+            ]},
+            {'exercise': squat.pk, 'sets': [{'reps': 5, 'weight': '140'}]},
+        ], name='Monday')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['name'], 'Monday')
+        self.assertEqual(
+            [(item['order'], [s['set_number'] for s in item['sets']])
+             for item in response.data['exercises']],
+            [(0, [1, 2]), (1, [1])],
+        )
+        self.assertEqual(len(response.data['new_personal_records']), 8)
+        # The bulk inserts still refresh the rollups
+        self.assertEqual(
+            ExerciseDailySummary.objects.get(user=self.user, exercise=self.bench).max_weight,
+            Decimal('110'),
+        )
+
+    def test_rejects_duplicate_set_numbers(self):
+        response = self.log([{'exercise': self.bench.pk, 'sets': [
+            {'set_number': 1, 'reps': 5, 'weight': '100'},
+            {'set_number': 1, 'reps': 5, 'weight': '100'},
+        ]}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('sets', response.data['exercises'][0])
+
+    def test_rejects_duplicate_positions(self):
+        response = self.log([
+            {'exercise': self.bench.pk, 'order': 0},
+            {'exercise': self.bench.pk, 'order': 0},
+        ])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['exercises'][0], {})
+        self.assertIn('order', response.data['exercises'][1])
+
+    def test_rejects_other_users_private_exercises(self):
+        other = User.objects.create_user(
+            email='other@example.com', username='other', password='password'
+        )
+        private = Exercise.objects.create(name='Secret', created_by=other, is_public=False)
+
+        response = self.log([{'exercise': private.pk}, {'exercise': 999999}])
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('exercise', response.data['exercises'][0])
+        self.assertIn('exercise', response.data['exercises'][1])
+
+    def test_rejects_invalid_sets_and_too_many_sets(self):
+        negative = self.log([{'exercise': self.bench.pk, 'sets': [{'reps': 5, 'weight': '-1'}]}])
+        too_many = self.log([{
+            'exercise': self.bench.pk,
+            'sets': [{'reps': 1, 'weight': '1'}] * (MAX_LOGGED_SETS + 1),
+        }])
+
+        self.assertEqual(negative.status_code, 400)
+        self.assertEqual(too_many.status_code, 400)
+        self.assertFalse(Workout.objects.exists())
+
+
+class WorkoutListTests(WorkoutsTestCase):
+    def add_workout(self, day, sets):
+        workout = Workout.objects.create(user=self.user, date=day, name=f'Day {day.day}')
+        for order, (exercise, exercise_sets) in enumerate(sets):
+            workout_exercise = WorkoutExercise.objects.create(
+                workout=workout, exercise=exercise, order=order
+            )
+            for number, (weight, reps) in enumerate(exercise_sets, start=1):
+                Set.objects.create(
+                    workout_exercise=workout_exercise,
+                    set_number=number,
+                    weight=Decimal(weight),
+                    reps=reps,
+                )
+        return workout
+
+    def test_annotated_summary(self):
+        squat = Exercise.objects.create(name='Squat')
+        self.add_workout(date(2026, 1, 5), [
+            (squat, [(140, 5), (150, 3)]),
+            (self.bench, [(100, 5)]),
+        ])
+        self.add_workout(date(2026, 1, 6), [])
+
+        results = self.client.get('/api/workouts/').data['results']
+
+        self.assertEqual(
+            [
+                (item['exercise_count'], item['total_sets'], item['total_volume'],
+                 item['exercise_names'])
+                for item in results
+            ],
+            [(0, 0, '0.00', ''), (2, 3, '1650.00', 'Squat, Bench')],
+        )
+        self.assertNotIn('exercises', results[0])
+
+    def test_query_count_does_not_grow_with_the_page(self):
+        squat = Exercise.objects.create(name='Squat')
+        for day in range(1, 21):
+            self.add_workout(date(2026, 1, day), [
+                (self.bench, [(100, 5)] * 3), (squat, [(140, 5)] * 2),
+            ])
+
+        # The first request creates the data version counter the ETag reads;
+        # after that a page is the version, the workouts and their exercise names
+        self.client.get('/api/workouts/', {'page_size': 1})
+        with self.assertNumQueries(3):
+            response = self.client.get('/api/workouts/', {'page_size': 20})
+        self.assertEqual(len(response.data['results']), 20)
+
+
+class CursorPaginationTests(WorkoutsTestCase):
+    def setUp(self):
+        super().setUp()
+        start = date(2026, 1, 1)
+        for day in range(12):
+            # Several workouts share each date to exercise the id tiebreaker
+            for _ in range(day % 3 + 1):
+                Workout.objects.create(user=self.user, date=start + timedelta(days=day))
+
+    def walk(self, params):
+        response = self.client.get('/api/workouts/', params)
+        pages = [response.data]
+        while pages[-1]['next']:
+            pages.append(self.client.get(pages[-1]['next']).data)
+        return pages
+
+    def test_pages_cover_every_workout_once_in_order(self):
+        pages = self.walk({'page_size': 5})
+
+        ids = [item['id'] for page in pages for item in page['results']]
+        expected = list(
+            Workout.objects.filter(user=self.user).order_by('-date', '-created_at', '-id')
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertNotIn('count', pages[0])
+        self.assertIsNone(pages[0]['previous'])
+
+    def test_previous_links_walk_back_to_the_first_page(self):
+        pages = self.walk({'page_size': 5, 'ordering': 'date'})
+
+        page = pages[-1]
+        ids = [item['id'] for item in page['results']]
+        while page['previous']:
+            page = self.client.get(page['previous']).data
+            ids = [item['id'] for item in page['results']] + ids
+        self.assertEqual(ids, [item['id'] for page in pages for item in page['results']])
+
+    def test_count_is_opt_in(self):
+        response = self.client.get('/api/workouts/', {'count': 'true'})
+        self.assertEqual(response.data['count'], Workout.objects.filter(user=self.user).count())
+
+    def test_invalid_cursor(self):
+        response = self.client.get('/api/workouts/', {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_page_size_is_capped(self):
+        for _ in range(100):
+            Workout.objects.create(user=self.user, date=date(2026, 2, 1))
+
+        response = self.client.get('/api/workouts/', {'page_size': 500})
+
+        self.assertEqual(len(response.data['results']), 100)
+
+
+class SparseFieldsetTests(WorkoutsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.workout = Workout.objects.create(user=self.user, date=date(2026, 1, 5))
+        workout_exercise = WorkoutExercise.objects.create(
+            workout=self.workout, exercise=self.bench, order=0
+        )
+        Set.objects.create(
+            workout_exercise=workout_exercise, set_number=1, reps=5, weight=Decimal('100')
+        )
+
+    def test_fields_and_expand(self):
+        response = self.client.get(f'/api/workouts/{self.workout.pk}/', {
+            'fields': 'id,exercises.sets.weight',
+            'expand': 'exercises.sets',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'id': self.workout.pk,
+            'exercises': [{'sets': [{'weight': '100.00'}]}],
+        })
+
+    def test_unrequested_relations_are_not_queried(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/workouts/', {'fields': 'id,date'})
+
+        self.assertEqual(
+            response.data['results'], [{'id': self.workout.pk, 'date': '2026-01-05'}]
+        )
+        sql = ' '.join(query['sql'] for query in queries)
+        self.assertNotIn('workouts_workoutexercise', sql)
+        self.assertNotIn('workouts_set', sql)
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get('/api/workouts/', {'fields': 'id,bogus'})
+        self.assertEqual(response.status_code, 400)
+
+        response = self.client.get('/api/sets/', {'expand': 'workout'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_expanding_a_parent_keeps_nested_defaults(self):
+        response = self.client.get('/api/workouts/', {'expand': 'exercises'})
+
+        exercise = response.data['results'][0]['exercises'][0]
+        self.assertEqual(exercise['exercise_detail']['name'], 'Bench')
+        self.assertEqual(len(exercise['sets']), 1)
+
+    def test_expand_path_limits_its_level(self):
+        response = self.client.get(f'/api/workouts/{self.workout.pk}/', {
+            'expand': 'exercises.sets',
+        })
+
+        exercise = response.data['exercises'][0]
+        self.assertIn('sets', exercise)
+        self.assertNotIn('exercise_detail', exercise)
+
+    def test_requested_fields_are_expanded(self):
+        for params in (
+            {'fields': 'id,exercises.sets.weight', 'expand': 'exercises'},
+            # exercises is not expanded by default in lists
+            {'fields': 'id,exercises.sets.weight'},
+        ):
+            response = self.client.get('/api/workouts/', params)
+
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['results'], [{
+                'id': self.workout.pk,
+                'exercises': [{'sets': [{'weight': '100.00'}]}],
+            }])
 
-# Create your tests here.
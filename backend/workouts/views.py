@@ -2,20 +2,32 @@ from rest_framework import viewsets, filters, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db import transaction
 from django.db.models import Q
+from django.http import StreamingHttpResponse
 from datetime import date
 
 from .models import MuscleGroup, Exercise, Workout, WorkoutExercise, Set
+from .exports import EXPORT_FORMATS, chunked, export_rows
 from .serializers import (
     MuscleGroupSerializer,
     ExerciseSerializer,
     ExerciseListSerializer,
     WorkoutSerializer,
     WorkoutListSerializer,
+    WorkoutLogSerializer,
     WorkoutExerciseSerializer,
     WorkoutExerciseCreateSerializer,
     SetSerializer,
+    SetBatchSerializer,
 )
+from analytics import tracking
+from analytics.conditional import ConditionalGetMixin
+from analytics.records import detect_personal_records
+from analytics.serializers import PersonalRecordListSerializer
+from analytics.tracking import AtomicWriteMixin
+from woodshop_api.fieldsets import SparseFieldsetMixin
+from woodshop_api.pagination import KeysetPagination
 
 
 class MuscleGroupViewSet(viewsets.ReadOnlyModelViewSet):
@@ -58,7 +70,9 @@ class ExerciseViewSet(viewsets.ModelViewSet):
         serializer.save(created_by=self.request.user)
 
 
-class WorkoutViewSet(viewsets.ModelViewSet):
+class WorkoutViewSet(
+    AtomicWriteMixin, SparseFieldsetMixin, ConditionalGetMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for managing workouts
     """
@@ -66,6 +80,7 @@ class WorkoutViewSet(viewsets.ModelViewSet):
     filter_backends = [filters.OrderingFilter]
     ordering_fields = ['date', 'created_at']
     ordering = ['-date', '-created_at']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Return only user's workouts"""
@@ -95,16 +110,82 @@ class WorkoutViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         """Set the user when creating workout"""
-        serializer.save(user=self.request.user)
+        workout = serializer.save(user=self.request.user)
+        if workout.completed:
+            detect_personal_records(workout)
+
+    def perform_update(self, serializer):
+        """Check for new personal records when a workout becomes completed"""
+        was_completed = serializer.instance.completed
+        workout = serializer.save()
+        if workout.completed and not was_completed:
+            detect_personal_records(workout)
 
     @action(detail=True, methods=['post'])
     def complete(self, request, pk=None):
-        """Mark workout as completed"""
+        """Mark workout as completed and return any personal records it set"""
         workout = self.get_object()
-        workout.completed = True
-        workout.save()
+        new_records = []
+        if not workout.completed:
+            with transaction.atomic():
+                workout.completed = True
+                workout.save()
+                new_records = detect_personal_records(workout)
         serializer = self.get_serializer(workout)
-        return Response(serializer.data)
+        data = serializer.data
+        data['new_personal_records'] = PersonalRecordListSerializer(new_records, many=True).data
+        return Response(data)
+
+    @action(detail=False, methods=['post'])
+    def log(self, request):
+        """
+        Create a workout with its exercises and sets from one nested payload
+        Returns the created workout as in retrieve, plus new_personal_records
+        """
+        serializer = WorkoutLogSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+
+        new_records = []
+        with transaction.atomic():
+            workout = serializer.save(user=request.user)
+            if workout.completed:
+                # Exercises and sets were bulk inserted, bypassing the signals
+                # that refresh the analytics rollups
+                tracking.mark_dirty(
+                    (workout.user_id, item['exercise'], workout.date)
+                    for item in serializer.validated_data['exercises']
+                )
+                new_records = detect_personal_records(workout)
+
+        workout = Workout.objects.prefetch_related(
+            'exercises__exercise__muscle_groups', 'exercises__sets'
+        ).get(pk=workout.pk)
+        data = WorkoutSerializer(workout, context=self.get_serializer_context()).data
+        data['new_personal_records'] = PersonalRecordListSerializer(new_records, many=True).data
+        return Response(data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream the user's full history, one row per set
+        Query params: file_format=csv|ndjson (default csv), plus the list filters
+        """
+        file_format = request.query_params.get('file_format', 'csv')
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {'error': f"file_format must be one of: {', '.join(EXPORT_FORMATS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        content_type, lines = EXPORT_FORMATS[file_format]
+        response = StreamingHttpResponse(
+            chunked(lines(export_rows(self.get_queryset()))),
+            content_type=content_type
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="workouts-{date.today().isoformat()}.{file_format}"'
+        )
+        return response
 
     @action(detail=False, methods=['get'])
     def today(self, request):
@@ -116,7 +197,7 @@ class WorkoutViewSet(viewsets.ModelViewSet):
         return Response({'detail': 'No workout for today'}, status=status.HTTP_404_NOT_FOUND)
 
 
-class WorkoutExerciseViewSet(viewsets.ModelViewSet):
+class WorkoutExerciseViewSet(AtomicWriteMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing workout exercises
     """
@@ -135,15 +216,49 @@ class WorkoutExerciseViewSet(viewsets.ModelViewSet):
         return WorkoutExerciseSerializer
 
 
-class SetViewSet(viewsets.ModelViewSet):
+class SetViewSet(AtomicWriteMixin, SparseFieldsetMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing sets within workout exercises
     """
     serializer_class = SetSerializer
     permission_classes = [IsAuthenticated]
+    filter_backends = [filters.OrderingFilter]
+    ordering_fields = ['created_at']
+    ordering = ['-created_at']
+    pagination_class = KeysetPagination
 
     def get_queryset(self):
         """Return sets for user's workouts only"""
         return Set.objects.filter(
             workout_exercise__workout__user=self.request.user
         ).select_related('workout_exercise__exercise')
+
+    @action(detail=False, methods=['post'])
+    def batch(self, request):
+        """
+        Create, update and delete sets of any of the user's workout exercises
+        in one transaction
+        Body: create (list of sets), update (list of id plus changed fields),
+        delete (list of ids); set numbers only need to be unique afterwards
+        Returns: created, updated, deleted
+        """
+        serializer = SetBatchSerializer(data=request.data, context=self.get_serializer_context())
+        serializer.is_valid(raise_exception=True)
+
+        with transaction.atomic():
+            # Bulk writes bypass the signals that refresh the analytics rollups.
+            # The owners loaded during validation also spare the delete signals
+            # a lookup per set.
+            tracking.remember_workout_exercises(
+                (workout_exercise_id, *row)
+                for workout_exercise_id, row in serializer.workout_exercise_rows.items()
+            )
+            result = serializer.apply()
+            for workout_exercise_id in serializer.workout_exercise_rows:
+                tracking.mark_workout_exercise(workout_exercise_id)
+
+        return Response({
+            'created': SetSerializer(result['created'], many=True).data,
+            'updated': SetSerializer(result['updated'], many=True).data,
+            'deleted': result['deleted'],
+        })
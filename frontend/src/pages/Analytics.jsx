@@ -1,6 +1,6 @@
 import { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import { analyticsService, personalRecordService } from '../services/analyticsService';
+import { analyticsService } from '../services/analyticsService';
 import { LineChart, Line, BarChart, Bar, PieChart, Pie, Cell, XAxis, YAxis, CartesianGrid, Tooltip, Legend, ResponsiveContainer } from 'recharts';
 import './Analytics.css';
 
@@ -21,18 +21,15 @@ function Analytics() {
   const loadAnalyticsData = async () => {
     setLoading(true);
     try {
-      // Load all analytics data in parallel
-      const [statsRes, volumeRes, muscleGroupRes, prsRes] = await Promise.all([
-        analyticsService.getWorkoutStats(),
-        analyticsService.getVolumeTrend(),
-        analyticsService.getFrequencyByMuscleGroup(),
-        personalRecordService.getAll({ ordering: '-date_achieved' }),
-      ]);
-
-      setWorkoutStats(statsRes.data);
-      setVolumeTrend(volumeRes.data);
-      setMuscleGroupFrequency(muscleGroupRes.data);
-      setPersonalRecords(prsRes.data.results || prsRes.data);
+      // Load all analytics data in one request
+      const { data } = await analyticsService.getDashboard({
+        include: 'stats,volume_trend,muscle_groups,personal_records',
+      });
+
+      setWorkoutStats(data.stats);
+      setVolumeTrend(data.volume_trend);
+      setMuscleGroupFrequency(data.muscle_groups);
+      setPersonalRecords(data.personal_records);
     } catch (err) {
       console.error('Error loading analytics:', err);
       setError('Failed to load analytics data');
@@ -91,6 +88,10 @@ function Analytics() {
           <h3>Current Streak</h3>
           <p className="stat-value">{workoutStats?.current_streak || 0} days</p>
         </div>
+        <div className="stat-card">
+          <h3>Longest Streak</h3>
+          <p className="stat-value">{workoutStats?.longest_streak || 0} days</p>
+        </div>
         <div className="stat-card">
           <h3>Total Volume</h3>
           <p className="stat-value">{parseFloat(workoutStats?.total_volume || 0).toLocaleString()} lbs</p>
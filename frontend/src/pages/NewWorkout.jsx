@@ -1,16 +1,12 @@
 import { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import {
-  workoutService,
-  exerciseService,
-  workoutExerciseService,
-  setService,
-} from '../services/workoutService';
+import { workoutService, exerciseService } from '../services/workoutService';
 
 const NewWorkout = () => {
   const navigate = useNavigate();
-  const [step, setStep] = useState(1); // 1: Create workout, 2: Add exercises, 3: Log sets
-  const [workout, setWorkout] = useState(null);
+  // 1: Workout details, 2: Add exercises, 3: Log sets. Nothing is saved
+  // until the workout is finished, then it is logged in one request.
+  const [step, setStep] = useState(1);
   const [workoutName, setWorkoutName] = useState('');
   const [workoutDate, setWorkoutDate] = useState(new Date().toISOString().split('T')[0]);
 
@@ -20,11 +16,11 @@ const NewWorkout = () => {
   const [searchQuery, setSearchQuery] = useState('');
   const [loading, setLoading] = useState(false);
 
-  // Set logging
-  const [workoutExercises, setWorkoutExercises] = useState([]);
+  // Set logging, keyed by exercise id
   const [currentExerciseIndex, setCurrentExerciseIndex] = useState(0);
   const [sets, setSets] = useState({});
   const [currentSet, setCurrentSet] = useState({ reps: '', weight: '' });
+  const [saving, setSaving] = useState(false);
 
   useEffect(() => {
     if (step === 2) {
@@ -44,19 +40,8 @@ const NewWorkout = () => {
     }
   };
 
-  const handleCreateWorkout = async () => {
-    try {
-      const response = await workoutService.create({
-        date: workoutDate,
-        name: workoutName || `Workout ${workoutDate}`,
-        completed: false,
-      });
-      setWorkout(response.data);
-      setStep(2);
-    } catch (err) {
-      alert('Failed to create workout');
-      console.error(err);
-    }
+  const handleCreateWorkout = () => {
+    setStep(2);
   };
 
   const handleAddExercise = (exercise) => {
@@ -69,58 +54,36 @@ const NewWorkout = () => {
     setSelectedExercises(selectedExercises.filter((e) => e.id !== exerciseId));
   };
 
-  const handleContinueToSets = async () => {
-    try {
-      // Create workout exercises
-      const createdExercises = [];
-      for (let i = 0; i < selectedExercises.length; i++) {
-        const response = await workoutExerciseService.create({
-          workout: workout.id,
-          exercise: selectedExercises[i].id,
-          order: i,
-        });
-        createdExercises.push(response.data);
-      }
-      setWorkoutExercises(createdExercises);
-      setStep(3);
-    } catch (err) {
-      alert('Failed to add exercises');
-      console.error(err);
-    }
+  const handleContinueToSets = () => {
+    setCurrentExerciseIndex(0);
+    setStep(3);
   };
 
-  const handleAddSet = async () => {
+  const handleAddSet = () => {
     if (!currentSet.reps || !currentSet.weight) {
       alert('Please enter reps and weight');
       return;
     }
 
-    try {
-      const workoutExercise = workoutExercises[currentExerciseIndex];
-      const currentSets = sets[workoutExercise.id] || [];
-      const setNumber = currentSets.length + 1;
-
-      const response = await setService.create({
-        workout_exercise: workoutExercise.id,
-        set_number: setNumber,
-        reps: parseInt(currentSet.reps),
-        weight: parseFloat(currentSet.weight),
-        completed: true,
-      });
-
-      setSets({
-        ...sets,
-        [workoutExercise.id]: [...currentSets, response.data],
-      });
-      setCurrentSet({ reps: '', weight: '' });
-    } catch (err) {
-      alert('Failed to log set');
-      console.error(err);
-    }
+    const exercise = selectedExercises[currentExerciseIndex];
+    const currentSets = sets[exercise.id] || [];
+    setSets({
+      ...sets,
+      [exercise.id]: [
+        ...currentSets,
+        {
+          set_number: currentSets.length + 1,
+          reps: parseInt(currentSet.reps),
+          weight: parseFloat(currentSet.weight),
+          completed: true,
+        },
+      ],
+    });
+    setCurrentSet({ reps: '', weight: '' });
   };
 
   const handleNextExercise = () => {
-    if (currentExerciseIndex < workoutExercises.length - 1) {
+    if (currentExerciseIndex < selectedExercises.length - 1) {
       setCurrentExerciseIndex(currentExerciseIndex + 1);
       setCurrentSet({ reps: '', weight: '' });
     }
@@ -135,11 +98,23 @@ const NewWorkout = () => {
 
   const handleFinishWorkout = async () => {
     try {
-      await workoutService.complete(workout.id);
+      setSaving(true);
+      await workoutService.log({
+        date: workoutDate,
+        name: workoutName || `Workout ${workoutDate}`,
+        completed: true,
+        exercises: selectedExercises.map((exercise, order) => ({
+          exercise: exercise.id,
+          order,
+          sets: sets[exercise.id] || [],
+        })),
+      });
       navigate('/workouts');
     } catch (err) {
-      alert('Failed to complete workout');
+      alert('Failed to save workout');
       console.error(err);
+    } finally {
+      setSaving(false);
     }
   };
 
@@ -259,16 +234,15 @@ const NewWorkout = () => {
   }
 
   // Step 3: Log Sets
-  if (step === 3 && workoutExercises.length > 0) {
-    const currentWorkoutExercise = workoutExercises[currentExerciseIndex];
+  if (step === 3 && selectedExercises.length > 0) {
     const currentExercise = selectedExercises[currentExerciseIndex];
-    const currentExerciseSets = sets[currentWorkoutExercise.id] || [];
+    const currentExerciseSets = sets[currentExercise.id] || [];
 
     return (
       <div style={styles.container}>
         <div style={styles.header}>
           <h1 style={styles.title}>
-            {currentExercise.name} ({currentExerciseIndex + 1}/{workoutExercises.length})
+            {currentExercise.name} ({currentExerciseIndex + 1}/{selectedExercises.length})
           </h1>
         </div>
         <div style={styles.content}>
@@ -279,7 +253,7 @@ const NewWorkout = () => {
             ) : (
               <div style={styles.setsList}>
                 {currentExerciseSets.map((set) => (
-                  <div key={set.id} style={styles.setItem}>
+                  <div key={set.set_number} style={styles.setItem}>
                     Set {set.set_number}: {set.reps} reps @ {set.weight} lbs
                   </div>
                 ))}
@@ -324,13 +298,17 @@ const NewWorkout = () => {
                   ← Previous Exercise
                 </button>
               )}
-              {currentExerciseIndex < workoutExercises.length - 1 ? (
+              {currentExerciseIndex < selectedExercises.length - 1 ? (
                 <button onClick={handleNextExercise} style={styles.navButton}>
                   Next Exercise →
                 </button>
               ) : (
-                <button onClick={handleFinishWorkout} style={styles.finishButton}>
-                  Finish Workout
+                <button
+                  onClick={handleFinishWorkout}
+                  disabled={saving}
+                  style={styles.finishButton}
+                >
+                  {saving ? 'Saving...' : 'Finish Workout'}
                 </button>
               )}
             </div>
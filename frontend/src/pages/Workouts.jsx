@@ -15,7 +15,7 @@ const Workouts = () => {
   const fetchWorkouts = async () => {
     try {
       setLoading(true);
-      const response = await workoutService.getAll({ limit: 50 });
+      const response = await workoutService.getAll({ page_size: 50 });
       setWorkouts(response.data.results || []);
     } catch (err) {
       setError('Failed to load workouts');
@@ -90,6 +90,9 @@ const Workouts = () => {
                     </>
                   )}
                 </div>
+                {workout.exercise_names && (
+                  <div style={styles.cardExercises}>{workout.exercise_names}</div>
+                )}
               </div>
             ))}
           </div>
@@ -204,6 +207,14 @@ const styles = {
     display: 'flex',
     gap: '8px',
   },
+  cardExercises: {
+    fontSize: '13px',
+    color: '#999',
+    marginTop: '8px',
+    overflow: 'hidden',
+    textOverflow: 'ellipsis',
+    whiteSpace: 'nowrap',
+  },
 };
 
 export default Workouts;
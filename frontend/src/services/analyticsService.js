@@ -8,6 +8,8 @@ export const personalRecordService = {
   update: (id, data) => api.put(`/personal-records/${id}/`, data),
   delete: (id) => api.delete(`/personal-records/${id}/`),
   getByExercise: (exerciseId) => api.get(`/personal-records/by_exercise/`, { params: { exercise_id: exerciseId } }),
+  getHistory: (params = {}) => api.get('/personal-records/history/', { params }),
+  getPercentiles: (params = {}) => api.get('/personal-records/percentiles/', { params }),
 };
 
 // Progress Snapshots Service
@@ -18,6 +20,7 @@ export const progressSnapshotService = {
   update: (id, data) => api.put(`/progress-snapshots/${id}/`, data),
   delete: (id) => api.delete(`/progress-snapshots/${id}/`),
   getLatest: () => api.get('/progress-snapshots/latest/'),
+  getTrend: (params = {}) => api.get('/progress-snapshots/trend/', { params }),
 };
 
 // Analytics Service
@@ -28,16 +31,31 @@ export const analyticsService = {
       params: { exercise_id: exerciseId, ...params }
     }),
 
+  // Get progress for several exercises at once, keyed by exercise id
+  getExercisesProgress: (exerciseIds, params = {}) =>
+    api.get('/analytics/exercises_progress/', {
+      params: { exercise_ids: exerciseIds.join(','), ...params }
+    }),
+
   // Get overall workout statistics
   getWorkoutStats: () => api.get('/analytics/workout_stats/'),
 
-  // Get volume trend (weekly)
+  // Get volume trend (granularity: day, week or month)
   getVolumeTrend: (params = {}) =>
     api.get('/analytics/volume_trend/', { params }),
 
   // Get frequency by muscle group
   getFrequencyByMuscleGroup: (params = {}) =>
     api.get('/analytics/frequency_by_muscle_group/', { params }),
+
+  // Get stats, volume trend, muscle groups, recent PRs and the latest
+  // snapshot in one request (include: comma separated subset of sections)
+  getDashboard: (params = {}) => api.get('/analytics/dashboard/', { params }),
+
+  // Get daily training load with its acute:chronic ratio and monotony
+  // (start_date, end_date; default the last 365 days)
+  getTrainingLoad: (params = {}) =>
+    api.get('/analytics/training_load/', { params }),
 };
 
 export default {
@@ -28,7 +28,12 @@ export const workoutService = {
   update: (id, data) => api.patch(`/workouts/${id}/`, data),
   delete: (id) => api.delete(`/workouts/${id}/`),
   complete: (id) => api.post(`/workouts/${id}/complete/`),
+  // Create a workout with its exercises and sets in one request
+  log: (data) => api.post('/workouts/log/', data),
   getToday: () => api.get('/workouts/today/'),
+  // Full history, one row per set (file_format: csv or ndjson)
+  exportHistory: (params = {}) =>
+    api.get('/workouts/export/', { params, responseType: 'blob' }),
 };
 
 // Workout exercise endpoints
@@ -47,4 +52,6 @@ export const setService = {
   create: (data) => api.post('/sets/', data),
   update: (id, data) => api.patch(`/sets/${id}/`, data),
   delete: (id) => api.delete(`/sets/${id}/`),
+  // Create, update and delete sets in one request ({ create, update, delete })
+  batch: (data) => api.post('/sets/batch/', data),
 };